@@ -0,0 +1,105 @@
+"""
+Tiempo de importación en frío de app.py y de cada página (arranque de contenedor / primer pintado).
+
+    python -m bench.imports                     # compara con bench/imports_baseline.json si existe
+    python -m bench.imports --save-baseline     # guarda la línea base de esta máquina
+
+Para cada entrada se extraen los imports de nivel módulo del script (sin ejecutar la página) y
+se corren en un intérprete nuevo --repeat veces; tiempo = mediana. Con -X importtime se listan
+los paquetes raíz que más pesan. Sale con código 1 si alguna entrada carga una dependencia
+pesada (HEAVY: deben importarse recién al usarse) o si hay regresiones respecto de la línea base.
+"""
+from __future__ import annotations
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).with_name("imports_baseline.json")
+HEAVY = ("plotly.express", "pptx", "weasyprint", "google.genai", "statsmodels", "kaleido", "duckdb")
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+exec(compile({code!r}, {name!r}, "exec"), {{}})
+s = time.perf_counter() - t
+print(json.dumps({{"s": s, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+def entries() -> Dict[str, str]:
+    """Nombre -> código con los imports de nivel módulo de app.py y pages/*.py."""
+    out = {}
+    for path in [ROOT / "app.py", *sorted((ROOT / "pages").glob("*.py"))]:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+        out[path.stem] = ast.unparse(ast.Module(body=nodes, type_ignores=[]))
+    return out
+
+def _top_imports(stderr: str, n: int = 5) -> List[List[Any]]:
+    """Paquetes raíz (nivel 0 de -X importtime) con más tiempo acumulado, en ms."""
+    roots = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if name.strip() and not name[1:].startswith(" ") and cumulative.strip().isdigit():
+            roots.append([name.strip(), int(cumulative) / 1000])
+    return sorted(roots, key=lambda r: r[1], reverse=True)[:n]
+
+def measure(name: str, code: str, repeat: int) -> Dict[str, Any]:
+    env = dict(os.environ, COMMENTS_BACKEND="off")
+    probe = _PROBE.format(code=code, name=name, heavy=HEAVY)
+    times, heavy, top = [], [], []
+    for i in range(repeat):
+        cmd = [sys.executable, *(["-X", "importtime"] if i == 0 else []), "-c", probe]
+        proc = subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"importar {name} falló:\n{proc.stderr[-2000:]}")
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        if i == 0:  # -X importtime agrega overhead: esa corrida no cuenta para el tiempo
+            heavy, top = r["heavy"], _top_imports(proc.stderr)
+        else:
+            times.append(r["s"])
+    return {"s": statistics.median(times), "heavy": heavy, "top": top}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_s: float = 0.05) -> List[str]:
+    out = []
+    for name, cur in current.items():
+        ref = baseline.get(name)
+        if ref and cur["s"] > ref["s"] * (1 + tolerance) and cur["s"] - ref["s"] > min_delta_s:
+            out.append(f"{name}: {ref['s'] * 1000:.0f} ms -> {cur['s'] * 1000:.0f} ms")
+    return out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Tiempo de importación en frío de app.py y las páginas.")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="guarda los resultados como nueva línea base")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="margen relativo antes de marcar regresión")
+    args = ap.parse_args(argv)
+
+    results = {name: measure(name, code, args.repeat + 1) for name, code in entries().items()}
+    problems = []
+    for name, r in results.items():
+        top = "  ".join(f"{m} {ms:.0f}" for m, ms in r["top"])
+        print(f"  {name:<22} {r['s'] * 1000:>8.0f} ms   [{top}]")
+        if r["heavy"]:
+            problems.append(f"{name} importa {', '.join(r['heavy'])} al cargar")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=1), encoding="utf-8")
+        print(f"\nLínea base guardada en {args.baseline}")
+    elif args.baseline.exists():
+        problems += compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    print("\nProblemas:" if problems else "\nSin dependencias pesadas al importar ni regresiones.")
+    for line in problems:
+        print("  " + line)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
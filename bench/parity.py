@@ -0,0 +1,109 @@
+"""
+Paridad entre la ruta pandas y el backend SQL (DuckDB) de los transforms.
+
+    python -m bench.parity                  # con los datos de data/ (o DATA_DIR)
+    python -m bench.parity --users 200000   # con un dataset sintético
+
+Corre cada transform con ambos backends para todas las instituciones y el total, con y sin
+rango de registro, y compara los resultados sin considerar el índice ni el orden de empates
+(salvo en ORDERED, donde el orden de filas también debe coincidir). Sale con código 1 si alguna
+salida difiere. Los mismos casos corren en pytest (tests/test_sql_backend.py).
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+import pandas as pd
+
+CASES: Dict[str, Callable] = {
+    "skills_coverage": lambda T, d, i, r: T.skills_coverage(d, i, r),
+    "skills_coverage[soft]": lambda T, d, i, r: T.skills_coverage(d, i, r, skill_type="soft"),
+    "skills_heatmap": lambda T, d, i, r: T.skills_heatmap(d, i, r),
+    "skills_gaps_vs_global": lambda T, d, i, r: T.skills_gaps_vs_global(d, i, r),
+    "salaries_experience_df": lambda T, d, i, r: T.salaries_experience_df(d, i, r),
+    "salaries_box_by_group": lambda T, d, i, r: T.salaries_box_by_group(d, i, r),
+    "languages_distribution": lambda T, d, i, r: T.languages_distribution(d, i, r),
+    "languages_level_summary": lambda T, d, i, r: T.languages_level_summary(d, i, r),
+    "registrations_by_month": lambda T, d, i, r: T.registrations_by_month(d, i, r),
+    "ready_to_hire_table": lambda T, d, i, r: T.ready_to_hire_table(d, i, r),
+    "ready_to_hire_table[en,es]": lambda T, d, i, r: T.ready_to_hire_table(d, i, r, min_exp_years=2.0, lang_required=["en", "es"]),
+}
+
+# Salidas cuyo orden de filas es parte del resultado (orden de users / ranking con desempate por fila)
+ORDERED = {"salaries_experience_df", "ready_to_hire_table", "ready_to_hire_table[en,es]"}
+
+def _normalize(df: pd.DataFrame, sort: bool = True) -> pd.DataFrame:
+    """Valores comparables: sin índice, categorías como texto, nulos unificados y (con `sort`) filas ordenadas."""
+    out = df.reset_index(drop=True).copy()
+    for c in out.columns:
+        s = out[c]
+        if isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(s) or s.dtype == object:
+            out[c] = s.astype(object).where(s.notna(), None).map(lambda v: None if v is None else str(v))
+        elif pd.api.types.is_numeric_dtype(s):
+            out[c] = s.astype(float)
+    if not sort or not len(out.columns):
+        return out
+    return out.sort_values(list(out.columns), ignore_index=True, na_position="first")
+
+def _same(a: pd.DataFrame, b: pd.DataFrame, ordered: bool = False) -> Tuple[bool, str]:
+    if list(a.columns) != list(b.columns):
+        return False, f"columnas {list(a.columns)} != {list(b.columns)}"
+    if len(a) != len(b):
+        return False, f"filas {len(a)} != {len(b)}"
+    a, b = _normalize(a, sort=not ordered), _normalize(b, sort=not ordered)
+    try:
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, rtol=1e-9, atol=1e-9)
+    except AssertionError as e:
+        return False, str(e).splitlines()[0]
+    return True, ""
+
+def check_parity(raw, date_ranges=(None,)) -> List[str]:
+    """Mensajes de diferencia entre backends (lista vacía = paridad)."""
+    from src import io_load, transforms as T
+    institutions = [i for i in io_load.list_institutions(raw["users"]) if i != "(sin datos)"] + [None]
+    problems = []
+    timings = {"pandas": 0.0, "duckdb": 0.0}
+    for name, call in CASES.items():
+        for inst in institutions:
+            for dr in date_ranges:
+                results = {}
+                for backend in ("pandas", "duckdb"):
+                    T.TRANSFORMS_BACKEND = backend
+                    for cache in (io_load._VIEWS, T._SEGMENTS):
+                        cache.clear()
+                    t = time.perf_counter()
+                    results[backend] = call(T, raw, inst, dr)
+                    timings[backend] += time.perf_counter() - t
+                ok, why = _same(results["pandas"], results["duckdb"], ordered=name in ORDERED)
+                if not ok:
+                    problems.append(f"{name} inst={inst} rango={dr}: {why}")
+    print(f"tiempo total pandas {timings['pandas']:.2f}s  duckdb {timings['duckdb']:.2f}s")
+    return problems
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Compara los transforms pandas vs DuckDB.")
+    ap.add_argument("--users", type=int, help="usar un dataset sintético de este tamaño en vez de data/")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    from src import io_load
+    if args.users:
+        from bench.synth import generate
+        dfs = {name: io_load._prepare_table(name, df) for name, df in generate(args.users, args.seed).items()}
+        raw = io_load.index_tables(io_load._encode_user_ids(dfs))
+    else:
+        raw = io_load.load_raw()
+    reg = raw["users"]["registration_date"].dropna()
+    mid = reg.min() + (reg.max() - reg.min()) / 2
+    date_ranges = (None, (str(reg.min().date()), str(mid.date())), (str(mid.date()), str(reg.max().date())))
+
+    problems = check_parity(raw, date_ranges)
+    for p in problems:
+        print("DIFERENCIA", p)
+    n = len(CASES) * (len(io_load.list_institutions(raw["users"])) + 1) * len(date_ranges)
+    print(f"{n} comparaciones, {len(problems)} diferencias")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
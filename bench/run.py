@@ -0,0 +1,214 @@
+"""
+Benchmark de carga, filtrado y transforms sobre datasets sintéticos (bench/synth.py).
+
+    python -m bench.run --sizes 10000 100000 1000000            # compara con bench/baseline.json si existe
+    python -m bench.run --sizes 10000 100000 --save-baseline    # guarda la línea base de esta máquina
+
+Cada tamaño corre en un subproceso propio (memoria pico limpia): mide load_raw en frío
+(parseo de Excel + snapshots) y en caliente (snapshots Parquet) cuando el dataset cabe en
+Excel, o el tipado + índice en memoria cuando no; luego el filtro por institución/fecha y
+cada transform, para la institución más grande y para todo el dataset.
+Tiempo = mediana de --repeat corridas con caches derivadas vacías; memoria = pico de
+tracemalloc en una corrida aparte (Python/numpy; lo asignado por Arrow sólo se ve en el
+maxrss del subproceso). Sale con código 1 si hay regresiones.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Any
+
+BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+def _measure(fn: Callable[[], Any], repeat: int, reset: Callable[[], None]) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        reset()
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    reset()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"s": statistics.median(times), "peak_mb": peak / 2**20}
+
+def machine() -> Dict[str, Any]:
+    """Datos de la máquina que acompañan cada corrida (una línea base sólo vale en su máquina)."""
+    cpu = platform.processor()
+    try:
+        cpu = next(l.split(":", 1)[1].strip() for l in open("/proc/cpuinfo") if l.startswith("model name"))
+    except (OSError, StopIteration):
+        pass
+    mem_gb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**30
+    return {"cpu": cpu, "cpus": os.cpu_count(), "mem_gb": round(mem_gb, 1),
+            "os": platform.platform(terse=True), "python": platform.python_version()}
+
+def _worker(n_users: int, repeat: int, excel_max: int, seed: int) -> Dict[str, Any]:
+    """Corre dentro del subproceso: DATA_DIR/CACHE_DIR ya apuntan a un directorio temporal."""
+    from bench.synth import generate, write_dataset
+    from src import io_load, transforms
+
+    results: Dict[str, Dict[str, float]] = {}
+    t = time.perf_counter()
+    tables = generate(n_users, seed)
+    results["synth.generate"] = {"s": time.perf_counter() - t, "peak_mb": 0.0}
+    rows = {name: len(df) for name, df in tables.items()}
+
+    def clear_derived():
+        for cache in (io_load._VIEWS, transforms._CUBES, transforms._GLOBAL_COVERAGE, transforms._SEGMENTS,
+                      transforms._SKILL_MATRICES, transforms._REG_SERIES, transforms._QUANTILES):
+            cache.clear()
+
+    if max(rows.values()) <= excel_max:
+        write_dataset(tables, io_load.DATA_DIR, "xlsx")
+        del tables
+
+        def cold():
+            io_load.load_raw.clear()
+            io_load._read_excel.clear()
+            for p in io_load.CACHE_DIR.glob("*.json"):
+                p.unlink()
+
+        results["load_raw.frio"] = _measure(lambda: io_load.load_raw(), repeat, cold)
+        results["load_raw.caliente"] = _measure(lambda: io_load.load_raw(), repeat, io_load.load_raw.clear)
+        raw = io_load.load_raw()
+    else:
+        prepared = {}
+        def prepare():
+            dfs = {name: io_load._prepare_table(name, df.copy()) for name, df in tables.items()}
+            prepared["raw"] = io_load.index_tables(io_load._encode_user_ids(dfs))
+        results["load_raw.tipado_e_indice"] = _measure(prepare, repeat, lambda: None)
+        raw = prepared.pop("raw")
+        del tables
+
+    users = raw["users"]
+    inst = users["institution_name"].value_counts().index[0]
+    reg = users["registration_date"]
+    last_year = (reg.max() - io_load.pd.Timedelta(days=365), reg.max())
+
+    results["filter.institucion"] = _measure(lambda: io_load.filter_by_institution_and_date(raw, inst), repeat, clear_derived)
+    results["filter.institucion_fecha"] = _measure(
+        lambda: io_load.filter_by_institution_and_date(raw, inst, last_year), repeat, clear_derived)
+
+    calls = {
+        "compute_kpis_snapshot": lambda d, i: transforms.compute_kpis_snapshot(d, i),
+        "dist_situacion_actual": lambda d, i: transforms.dist_situacion_actual(d, i),
+        "dist_modalidad": lambda d, i: transforms.dist_modalidad(d, i),
+        "dist_status_academic": lambda d, i: transforms.dist_status_academic(d, i),
+        "skills_coverage": lambda d, i: transforms.skills_coverage(d, i),
+        "skills_heatmap": lambda d, i: transforms.skills_heatmap(d, i),
+        "skills_gaps_vs_global": lambda d, i: transforms.skills_gaps_vs_global(d, i),
+        "salaries_experience_df": lambda d, i: transforms.salaries_experience_df(d, i),
+        "salaries_box_by_group": lambda d, i: transforms.salaries_box_by_group(d, i),
+        "languages_distribution": lambda d, i: transforms.languages_distribution(d, i),
+        "languages_level_summary": lambda d, i: transforms.languages_level_summary(d, i),
+        "registrations_by_month": lambda d, i: transforms.registrations_by_month(d, i),
+        "ready_to_hire_table": lambda d, i: transforms.ready_to_hire_table(d, i, lang_required=["en"]),
+        "kpi_cube": lambda d, i: transforms.kpi_cube(d),
+    }
+    for name, call in calls.items():
+        for label, scope in (("inst", inst), ("global", None)):
+            if name == "kpi_cube" and label == "inst":
+                continue
+            results[f"transforms.{name}[{label}]"] = _measure(lambda: call(raw, scope), repeat, clear_derived)
+
+    return {
+        "users": n_users,
+        "rows": rows,
+        "results": results,
+        "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "machine": machine(),
+    }
+
+def run_size(n_users: int, repeat: int, excel_max: int, seed: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f"bench_{n_users}_") as tmp:
+        env = dict(os.environ, DATA_DIR=str(Path(tmp) / "data"), CACHE_DIR=str(Path(tmp) / "cache"),
+                   COMMENTS_BACKEND="off")
+        cmd = [sys.executable, "-m", "bench.run", "--_worker", str(n_users), "--repeat", str(repeat),
+               "--excel-max", str(excel_max), "--seed", str(seed)]
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent.parent)
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark de {n_users} usuarios falló:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float,
+            min_delta_s: float = 0.005, min_delta_mb: float = 1.0) -> List[str]:
+    """Mensajes de regresión: más lento o más memoria que la línea base por encima de la tolerancia."""
+    base_by_size = {b["users"]: b["results"] for b in baseline}
+    out = []
+    for run in current:
+        base = base_by_size.get(run["users"])
+        if not base:
+            continue
+        for step, cur in run["results"].items():
+            ref = base.get(step)
+            if not ref or step == "synth.generate":
+                continue
+            if cur["s"] > ref["s"] * (1 + tolerance) and cur["s"] - ref["s"] > min_delta_s:
+                out.append(f"{run['users']:>9,} {step}: {ref['s']:.4f}s -> {cur['s']:.4f}s")
+            if cur["peak_mb"] > ref["peak_mb"] * (1 + tolerance) and cur["peak_mb"] - ref["peak_mb"] > min_delta_mb:
+                out.append(f"{run['users']:>9,} {step}: {ref['peak_mb']:.1f}MB -> {cur['peak_mb']:.1f}MB")
+    return out
+
+def _print_run(run: Dict[str, Any]):
+    print(f"\n== {run['users']:,} usuarios  (maxrss {run['maxrss_mb']:.0f} MB)  "
+          + "  ".join(f"{k}={v:,}" for k, v in run["rows"].items()))
+    for step, r in run["results"].items():
+        print(f"  {step:<48} {r['s'] * 1000:>10.1f} ms  {r['peak_mb']:>9.1f} MB")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark de load_raw, filtros y transforms por tamaño de dataset.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="usuarios por dataset (10k a 5M)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--excel-max", type=int, default=200_000,
+                    help="filas máx. por tabla para medir load_raw desde Excel (si no, sólo tipado + índice)")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="guarda los resultados como nueva línea base")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="margen relativo antes de marcar regresión")
+    ap.add_argument("--json", type=Path, help="además, guarda los resultados en este archivo")
+    ap.add_argument("--_worker", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args._worker:
+        print(json.dumps(_worker(args._worker, args.repeat, args.excel_max, args.seed)))
+        return 0
+
+    runs = []
+    for n in args.sizes:
+        runs.append(run_size(n, args.repeat, args.excel_max, args.seed))
+        _print_run(runs[-1])
+    if args.json:
+        args.json.write_text(json.dumps(runs, indent=1), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(runs, indent=1), encoding="utf-8")
+        print(f"\nLínea base guardada en {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nSin línea base ({args.baseline}); usa --save-baseline para crearla.")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    base_machine = next((b.get("machine") for b in baseline if b.get("machine")), None)
+    if base_machine and base_machine != machine():
+        print(f"\nAviso: la línea base es de otra máquina ({base_machine}); los tiempos no son comparables.")
+    regressions = compare(runs, baseline, args.tolerance)
+    print("\nRegresiones:" if regressions else "\nSin regresiones respecto de la línea base.")
+    for line in regressions:
+        print("  " + line)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
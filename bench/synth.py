@@ -0,0 +1,189 @@
+"""
+Generador de datasets sintéticos con el esquema de src/io_load.REQUIRED (10k a 5M usuarios).
+
+    python -m bench.synth --users 100000 --out /tmp/synth_100k --formato xlsx
+
+La proporción de filas hijas imita los Excel de muestra: ~1.3 experiencias, ~1.3 estudios,
+1 onboarding, 6-13 skills y 1-3 idiomas por usuario; el tamaño de las instituciones es sesgado
+(pocas grandes, muchas chicas) como en producción.
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from typing import Dict
+import numpy as np
+import pandas as pd
+from src.io_load import REQUIRED, TABLE_FILES
+
+INSTITUTIONS = ["UCSUR", "UNI", "UPC", "PUCP", "UNMSM", "UTEC", "USIL", "UNSA", "TECSUP", "CIBERTEC",
+                "UTP", "UPAO", "UPeU", "ESAN", "UPCH"]
+CAMPUS = ["Sede Central", "Campus Oeste", "Campus Norte", "Campus Sur", "Campus Este"]
+COUNTRIES = ["Perú", "México", "Chile", "Argentina", "Colombia"]
+REGIONS = ["Lambayeque", "Junín", "Tacna", "Loreto", "Cusco", "Lima", "La Libertad", "Piura", "Puno", "Arequipa"]
+CITIES = ["Lima", "Chiclayo", "Piura", "Trujillo", "Arequipa", "Huancayo", "Puno", "Iquitos", "Cusco", "Tacna"]
+GENDERS = ["Masculino", "Femenino", "No binario", "Prefiere no decir"]
+ROLES = ["Data Analyst", "Data Engineer", "Fullstack Developer", "Data Scientist", "BI Analyst", "ML Engineer",
+         "Backend Developer"]
+STATUS = ["Estudiante", "Egresado", "Docente", "Titulado"]
+MODALITY = ["Híbrido", "Presencial", "Remoto"]
+EDUCATION = ["Técnico", "Bachiller", "Titulado", "Maestría"]
+MAJORS = ["Computación", "Industrial", "Matemática", "Electrónica", "Sistemas", "Economía"]
+SECTORS = ["Finanzas", "Consultoría", "Salud", "Manufactura", "Transporte", "Energía", "Tecnología", "Educación",
+           "Retail", "Telecomunicaciones"]
+COMPANIES = ["Rappi", "Interbank", "Movistar", "BCP", "Rímac", "Falabella", "Globant", "Claro", "BBVA", "Auna", "Belcorp"]
+SITUACION = ["Freelance", "Estudiando", "Trabajando", "Buscando empleo"]
+OPORTUNIDAD = ["Tiempo completo", "Medio tiempo", "Freelance", "Prácticas", "Consultoría"]
+HARD_SKILLS = ["Docker", "Power BI", "Kubernetes", "AWS", "NLP", "PyTorch", "Spark", "Linux", "Excel",
+               "Great Expectations", "Elasticsearch", "Git", "Snowflake", "R", "SQL", "Python", "Databricks", "Hadoop",
+               "Airflow", "TensorFlow", "Azure", "Kafka", "DBT", "MySQL", "GCP", "Tableau", "Computer Vision",
+               "PostgreSQL", "scikit-learn", "MongoDB"]
+SOFT_SKILLS = ["Trabajo en equipo", "Creatividad", "Adaptabilidad", "Comunicación", "Liderazgo", "Gestión del tiempo",
+               "Pensamiento crítico", "Atención al detalle", "Aprendizaje continuo", "Empatía",
+               "Orientación a resultados", "Proactividad", "Resolución de problemas"]
+LANGS = ["es", "en", "pt", "fr", "de"]
+MCER = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+REG_START = np.datetime64("2020-01-01")
+REG_DAYS = 6 * 365
+CHUNK = 250_000  # usuarios por bloque al muestrear sin reemplazo (acota la memoria temporal)
+
+def _pick(rng: np.random.Generator, values, n: int, p=None) -> np.ndarray:
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=p)]
+
+def _fanout(rng: np.random.Generator, n_users: int, counts, probs) -> np.ndarray:
+    """user_id repetido según una cantidad de filas por usuario sorteada de `counts`."""
+    per_user = rng.choice(counts, size=n_users, p=probs)
+    return np.repeat(np.arange(1, n_users + 1, dtype=np.int64), per_user)
+
+def _sample_without_replacement(rng: np.random.Generator, n_users: int, n_items: int, lo: int, hi: int):
+    """(user_id, índice de ítem) con entre lo y hi ítems distintos por usuario."""
+    uids, items = [], []
+    for start in range(0, n_users, CHUNK):
+        m = min(CHUNK, n_users - start)
+        k = rng.integers(lo, hi + 1, size=m)
+        order = np.argsort(rng.random((m, n_items), dtype=np.float32), axis=1)
+        keep = np.arange(n_items)[None, :] < k[:, None]
+        rows, cols = np.nonzero(keep)
+        uids.append(rows.astype(np.int64) + start + 1)
+        items.append(order[rows, cols])
+    return np.concatenate(uids), np.concatenate(items)
+
+def _dates_between(rng: np.random.Generator, start: np.ndarray, max_days: int) -> np.ndarray:
+    return start + rng.integers(1, max_days, size=start.size).astype("timedelta64[D]")
+
+def generate(n_users: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Las 6 tablas (como salen de Excel: texto, enteros y fechas sin tipado compacto)."""
+    rng = np.random.default_rng(seed)
+    uid = np.arange(1, n_users + 1, dtype=np.int64)
+
+    inst_w = 1.0 / np.arange(1, len(INSTITUTIONS) + 1) ** 0.8
+    inst_idx = rng.choice(len(INSTITUTIONS), size=n_users, p=inst_w / inst_w.sum())
+    reg = REG_START + rng.integers(0, REG_DAYS, size=n_users).astype("timedelta64[D]")
+    users = pd.DataFrame({
+        "user_id": uid,
+        "full_name": pd.Series(uid).map("Usuario {}".format).to_numpy(dtype=object),
+        "email": pd.Series(uid).map("usuario{}@correo.pe".format).to_numpy(dtype=object),
+        "phone": pd.Series(rng.integers(900_000_000, 999_999_999, size=n_users)).map("+51 {}".format).to_numpy(dtype=object),
+        "institution_id": inst_idx + 1,
+        "institution_name": np.asarray(INSTITUTIONS, dtype=object)[inst_idx],
+        "campus": _pick(rng, CAMPUS, n_users),
+        "country": _pick(rng, COUNTRIES, n_users, p=[0.8, 0.05, 0.05, 0.05, 0.05]),
+        "region": _pick(rng, REGIONS, n_users),
+        "city": _pick(rng, CITIES, n_users),
+        "gender": _pick(rng, GENDERS, n_users, p=[0.48, 0.46, 0.03, 0.03]),
+        "current_role": _pick(rng, ROLES, n_users),
+        "status_academic": _pick(rng, STATUS, n_users, p=[0.4, 0.3, 0.05, 0.25]),
+        "registration_date": reg.astype("datetime64[ns]"),
+        "modality_preference": _pick(rng, MODALITY, n_users),
+        "highest_education": _pick(rng, EDUCATION, n_users),
+        "program_or_major": _pick(rng, MAJORS, n_users),
+    })
+
+    w_uid = _fanout(rng, n_users, [0, 1, 2, 3], [0.16, 0.44, 0.30, 0.10])
+    w_start = np.datetime64("2015-01-01") + rng.integers(0, 9 * 365, size=w_uid.size).astype("timedelta64[D]")
+    w_end = _dates_between(rng, w_start, 4 * 365)
+    workexperiences = pd.DataFrame({
+        "user_id": w_uid,
+        "position_title": _pick(rng, ROLES, w_uid.size),
+        "industry_sector": _pick(rng, SECTORS, w_uid.size),
+        "company_name": _pick(rng, COMPANIES, w_uid.size),
+        "start_date": w_start.astype("datetime64[ns]"),
+        "end_date": w_end.astype("datetime64[ns]"),
+        "duration_months": ((w_end - w_start).astype(np.int64) // 30).astype(np.int64),
+    })
+
+    e_uid = _fanout(rng, n_users, [1, 2], [0.72, 0.28])
+    e_start = np.datetime64("2012-01-01") + rng.integers(0, 10 * 365, size=e_uid.size).astype("timedelta64[D]")
+    educations = pd.DataFrame({
+        "user_id": e_uid,
+        "institution_academic": _pick(rng, INSTITUTIONS, e_uid.size),
+        "degree_level": _pick(rng, EDUCATION, e_uid.size),
+        "program_or_major": _pick(rng, MAJORS, e_uid.size),
+        "start_date": e_start.astype("datetime64[ns]"),
+        "end_date": _dates_between(rng, e_start, 6 * 365).astype("datetime64[ns]"),
+        "gpa": np.round(rng.normal(13, 2, size=e_uid.size).clip(5, 20), 2),
+    })
+
+    sal_min = rng.integers(12, 80, size=n_users) * 100
+    onboardings = pd.DataFrame({
+        "user_id": uid,
+        "situacion_actual": _pick(rng, SITUACION, n_users),
+        "oportunidad_buscada": _pick(rng, OPORTUNIDAD, n_users),
+        "salario_expect_min": sal_min,
+        "salario_expect_max": sal_min + rng.integers(5, 45, size=n_users) * 100,
+        "rol_identificado": _pick(rng, ROLES, n_users),
+    })
+
+    skill_names = np.asarray(HARD_SKILLS + SOFT_SKILLS, dtype=object)
+    skill_types = np.asarray(["hard"] * len(HARD_SKILLS) + ["soft"] * len(SOFT_SKILLS), dtype=object)
+    s_uid, s_idx = _sample_without_replacement(rng, n_users, len(skill_names), 6, 13)
+    skills = pd.DataFrame({
+        "user_id": s_uid,
+        "skill_name": skill_names[s_idx],
+        "skill_type": skill_types[s_idx],
+        "level": rng.integers(1, 6, size=s_uid.size),
+    })
+
+    l_uid, l_idx = _sample_without_replacement(rng, n_users, len(LANGS), 1, 3)
+    languages = pd.DataFrame({
+        "user_id": l_uid,
+        "lang_code": np.asarray(LANGS, dtype=object)[l_idx],
+        "level": _pick(rng, MCER, l_uid.size),
+    })
+
+    out = dict(users=users, workexperiences=workexperiences, educations=educations,
+               onboardings=onboardings, skills=skills, languages=languages)
+    for name, df in out.items():
+        assert list(df.columns) == REQUIRED[name], name
+    return out
+
+EXCEL_MAX_ROWS = 1_048_575
+
+def write_dataset(dfs: Dict[str, pd.DataFrame], out_dir, formato: str = "xlsx") -> Path:
+    """Escribe las tablas con los nombres de TABLE_FILES (xlsx, como data/) o como Parquet."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, df in dfs.items():
+        fname = out_dir / TABLE_FILES[name]
+        if formato == "xlsx":
+            if len(df) > EXCEL_MAX_ROWS:
+                raise ValueError(f"{name}: {len(df)} filas superan el máximo de Excel ({EXCEL_MAX_ROWS})")
+            df.to_excel(fname, index=False)
+        else:
+            df.to_parquet(fname.with_suffix(".parquet"), index=False)
+    return out_dir
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Genera un dataset sintético con el esquema de la app.")
+    ap.add_argument("--users", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", required=True, help="directorio de salida (se usa como DATA_DIR)")
+    ap.add_argument("--formato", choices=["xlsx", "parquet"], default="xlsx")
+    args = ap.parse_args(argv)
+    dfs = generate(args.users, args.seed)
+    write_dataset(dfs, args.out, args.formato)
+    print("  ".join(f"{name}={len(df):,}" for name, df in dfs.items()), "->", args.out)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,72 +1,80 @@
 import streamlit as st
-from src.io_load import load_raw, list_institutions
+from src.io_load import load_raw, list_institutions, institution_view
 from src.transforms import (
     compute_kpis_snapshot, dist_situacion_actual, dist_modalidad, dist_status_academic
 )
 from src.charts import kpi_block, bar_horizontal_pct, donut_chart
-from src.comments import make_comment_summary
-from src.export_ppt import export_ppt
+from src.comments import submit_comment
+from src.export_ppt import export_ppt_bytes, PPT_MIME
+from src.export_pdf import export_pdf_bytes, PDF_MIME
+from src.reports import kpi_comment_stats
+from src.profiling import page_profile
 
 st.title("📌 KPIs")
+with page_profile("KPIs"):  # panel opcional de tiempos (sidebar)
+    raw = load_raw()
+    institutions = list_institutions(raw["users"])
+    inst = st.sidebar.selectbox("Institución", options=institutions, index=0, key="kpis_inst")
 
-raw = load_raw()
-institutions = list_institutions(raw["users"])
-inst = st.sidebar.selectbox("Institución", options=institutions, index=0, key="kpis_inst")
+    date_range = st.sidebar.date_input("Rango de registro (opcional)", value=None, key="kpis_dates")
+    view = institution_view(raw, inst, date_range)  # se filtra una sola vez por rerun
 
-date_range = st.sidebar.date_input("Rango de registro (opcional)", value=None, key="kpis_dates")
+    kpis = compute_kpis_snapshot(view)
+    c1, c2, c3, c4 = st.columns(4)
+    kpi_block(c1, "Usuarios", kpis["usuarios_total"])
+    kpi_block(c2, "Activos 90d", f"{kpis['activos_90d_pct']:.1f}%")
+    kpi_block(c3, "Experiencia mediana (años)", f"{kpis['exp_mediana_anos']:.1f}")
+    kpi_block(c4, "Salario esperado mediano", f"S/ {kpis['sal_mediana']:.0f}")
 
-kpis = compute_kpis_snapshot(raw, institution=inst, date_range=date_range)
-c1, c2, c3, c4 = st.columns(4)
-kpi_block(c1, "Usuarios", kpis["usuarios_total"])
-kpi_block(c2, "Activos 90d", f"{kpis['activos_90d_pct']:.1f}%")
-kpi_block(c3, "Experiencia mediana (años)", f"{kpis['exp_mediana_anos']:.1f}")
-kpi_block(c4, "Salario esperado mediano", f"S/ {kpis['sal_mediana']:.0f}")
+    # Distribuciones clave
+    dist1 = dist_situacion_actual(view)
+    dist2 = dist_modalidad(view)
+    dist3 = dist_status_academic(view)
+    # El comentario se pide ya, en segundo plano, y se muestra al final sin frenar los gráficos
+    comment_future = submit_comment(module="KPIs", stats_dict=kpi_comment_stats(kpis, dist1, dist2))
 
-# Distribuciones clave
-dist1 = dist_situacion_actual(raw, inst, date_range)
-dist2 = dist_modalidad(raw, inst, date_range)
-dist3 = dist_status_academic(raw, inst, date_range)
+    fig1 = donut_chart(dist1, "Situación actual")
+    fig2 = donut_chart(dist2, "Preferencia de modalidad")
+    fig3 = donut_chart(dist3, "Estado académico")
 
-fig1 = donut_chart(dist1, "Situación actual")
-fig2 = donut_chart(dist2, "Preferencia de modalidad")
-fig3 = donut_chart(dist3, "Estado académico")
+    c5, c6, c7 = st.columns(3)
+    c5.plotly_chart(fig1, use_container_width=True)
+    c6.plotly_chart(fig2, use_container_width=True)
+    c7.plotly_chart(fig3, use_container_width=True)
 
-c5, c6, c7 = st.columns(3)
-c5.plotly_chart(fig1, use_container_width=True)
-c6.plotly_chart(fig2, use_container_width=True)
-c7.plotly_chart(fig3, use_container_width=True)
+    # Comentario
+    st.subheader("🗒️ Comentario automático")
+    with st.spinner("Generando comentario..."):
+        summary_text = comment_future.result()
+    st.write(summary_text)
 
-# Comentario
-st.subheader("🗒️ Comentario automático")
-summary_text = make_comment_summary(module="KPIs", stats_dict={
-    "usuarios_total": kpis["usuarios_total"],
-    "activos_90d_pct": round(kpis["activos_90d_pct"], 1),
-    "exp_mediana_anos": round(kpis["exp_mediana_anos"], 1),
-    "sal_mediana": round(kpis["sal_mediana"], 0),
-    "top_situacion": dist1.head(1).to_dict("records"),
-    "top_modalidad": dist2.head(1).to_dict("records")
-})
-st.write(summary_text)
+    # Exportar (PPT / PDF)
+    st.subheader("📤 Exportar")
+    figs = {"Situación actual": fig1, "Modalidad": fig2, "Estado académico": fig3}
+    formats = {  # etiqueta -> (exportador, extensión, mime)
+        "PowerPoint": (export_ppt_bytes, "pptx", PPT_MIME),
+        "PDF": (export_pdf_bytes, "pdf", PDF_MIME),
+    }
+    times = st.session_state.setdefault("export_times", {})  # último reporte de tiempos por formato
+    b1, b2 = st.columns(2)
+    for col, (label, (exporter, ext, mime)) in zip((b1, b2), formats.items()):
+        if not col.button(f"Exportar reporte a {label}"):
+            continue
+        # Se arma en memoria: nada se escribe en disco ni se pisa entre usuarios
+        try:
+            data, rep = exporter(institution=inst, kpis=kpis, figs=figs, comments=summary_text)
+        except RuntimeError as e:
+            col.error(str(e))
+            continue
+        times[label] = rep
+        col.success(f"Reporte listo: {rep['bytes'] / 1024:.0f} KB en {rep['total_s']:.2f}s "
+                    f"(render {rep['render_s']:.2f}s · armado {rep['armado_s']:.2f}s · guardado {rep['guardado_s']:.2f}s)")
+        if rep["sin_imagen"]:
+            col.warning(f"{rep['sin_imagen']} gráfico(s) sin imagen (¿falta 'kaleido'?).")
+        col.download_button(label=f"Descargar {ext.upper()}", data=data, file_name=f"Reporte_{inst}.{ext}", mime=mime)
 
-# Exportar PPT
-st.subheader("📤 Exportar")
-if st.button("Exportar reporte a PowerPoint"):
-    path = export_ppt(
-        institution=inst,
-        kpis=kpis,
-        figs={"Situación actual": fig1, "Modalidad": fig2, "Estado académico": fig3},
-        comments=summary_text
-    )
-    st.success(f"Reporte creado: {path}")
-
-    # 🔽 Botón de descarga (lee el archivo en el contenedor y lo ofrece al usuario)
-    try:
-        with open(path, "rb") as f:
-            st.download_button(
-                label="Descargar PPT",
-                data=f.read(),
-                file_name=f"Reporte_{inst}.pptx",
-                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
-            )
-    except Exception as e:
-        st.error(f"No se pudo abrir el archivo para descargar: {e}")
+    if len(times) > 1:
+        st.caption("Tiempos de la última exportación de cada formato (s)")
+        st.dataframe([{"formato": label, "KB": round(r["bytes"] / 1024), **{k: round(r[k], 3) for k in
+                      ("render_s", "armado_s", "guardado_s", "total_s")}} for label, r in times.items()],
+                     hide_index=True, use_container_width=True)
@@ -1,29 +1,40 @@
 import streamlit as st
-from src.io_load import load_raw, list_institutions
-from src.transforms import salaries_experience_df, salaries_box_by_group
+from src.io_load import load_raw, list_institutions, institution_view
+from src.transforms import salaries_experience_df, salaries_box_by_group, kpi_percentiles
 from src.charts import scatter_xy, boxplot
-from src.comments import make_comment_summary
+from src.comments import submit_comment
+from src.profiling import page_profile
 
 st.title("💰 Salarios & Experiencia")
+with page_profile("SalariosExp"):  # panel opcional de tiempos (sidebar)
+    raw = load_raw()
+    institutions = list_institutions(raw["users"])
+    inst = st.sidebar.selectbox("Institución", options=institutions, index=0, key="sal_inst")
+    date_range = st.sidebar.date_input("Rango de registro (opcional)", value=None, key="sal_dates")
+    view = institution_view(raw, inst, date_range)
 
-raw = load_raw()
-institutions = list_institutions(raw["users"])
-inst = st.sidebar.selectbox("Institución", options=institutions, index=0, key="sal_inst")
-date_range = st.sidebar.date_input("Rango de registro (opcional)", value=None, key="sal_dates")
+    df = salaries_experience_df(view)
+    # Percentiles desde los valores por institución × mes (misma población que las medianas de KPIs)
+    pct = kpi_percentiles(view)
+    # El comentario se pide ya, en segundo plano, y se muestra al final sin frenar los gráficos
+    comment_future = submit_comment(
+        module="SalariosExp",
+        stats_dict={
+            "corr_approx": round(df["exp_years"].corr(df["salario_mid"]), 2) if not df.empty else 0,
+            "salario_p50": round(pct.loc["salario_mid", "p50"], 0) if pct.loc["salario_mid", "n"] else 0,
+            "exp_p50": round(pct.loc["exp_years", "p50"], 1) if pct.loc["exp_years", "n"] else 0
+        }
+    )
+    st.plotly_chart(scatter_xy(df, x="exp_years", y="salario_mid", title="Dispersión: experiencia vs salario esperado"), use_container_width=True)
 
-df = salaries_experience_df(raw, inst, date_range)
-st.plotly_chart(scatter_xy(df, x="exp_years", y="salario_mid", title="Dispersión: experiencia vs salario esperado"), use_container_width=True)
+    box = salaries_box_by_group(view, group_col="situacion_actual")
+    st.plotly_chart(boxplot(box, y="salario_mid", x="situacion_actual", title="Salario esperado por situación actual"), use_container_width=True)
 
-box = salaries_box_by_group(raw, inst, date_range, group_col="situacion_actual")
-st.plotly_chart(boxplot(box, y="salario_mid", x="situacion_actual", title="Salario esperado por situación actual"), use_container_width=True)
+    st.subheader("Percentiles")
+    st.dataframe(pct.rename(index={"exp_years": "Experiencia (años)", "salario_mid": "Salario esperado (mid)"}).round(1),
+                 use_container_width=True)
 
-st.subheader("🗒️ Comentario automático")
-comment = make_comment_summary(
-    module="SalariosExp",
-    stats_dict={
-        "corr_approx": round(df["exp_years"].corr(df["salario_mid"]), 2) if not df.empty else 0,
-        "salario_p50": round(df["salario_mid"].median(), 0) if not df.empty else 0,
-        "exp_p50": round(df["exp_years"].median(), 1) if not df.empty else 0
-    }
-)
-st.write(comment)
+    st.subheader("🗒️ Comentario automático")
+    with st.spinner("Generando comentario..."):
+        comment = comment_future.result()
+    st.write(comment)
@@ -2,22 +2,28 @@ import streamlit as st
 from src.io_load import load_raw, list_institutions
 from src.transforms import registrations_by_month
 from src.charts import area_timeseries
-from src.comments import make_comment_summary
+from src.comments import submit_comment
+from src.profiling import page_profile
 
 st.title("⏱️ Series de Tiempo")
+with page_profile("Series"):  # panel opcional de tiempos (sidebar)
+    raw = load_raw()
+    institutions = list_institutions(raw["users"])
+    inst = st.sidebar.selectbox("Institución", options=institutions, index=0, key="ts_inst")
+    date_range = st.sidebar.date_input("Rango de registro (opcional)", value=None, key="ts_dates")
 
-raw = load_raw()
-institutions = list_institutions(raw["users"])
-inst = st.sidebar.selectbox("Institución", options=institutions, index=0, key="ts_inst")
+    ts = registrations_by_month(raw, inst, date_range)
+    # El comentario se pide ya, en segundo plano, y se muestra al final sin frenar el gráfico
+    comment_future = submit_comment(
+        module="Series",
+        stats_dict={
+            "peak_month": ts.sort_values("usuarios", ascending=False).head(1).to_dict("records")
+        }
+    )
+    st.plotly_chart(area_timeseries(ts, x="month", y="usuarios"), use_container_width=True)
+    st.plotly_chart(area_timeseries(ts, x="month", y="acumulado", title="Usuarios acumulados"), use_container_width=True)
 
-ts = registrations_by_month(raw, inst)
-st.plotly_chart(area_timeseries(ts, x="month", y="usuarios"), use_container_width=True)
-
-st.subheader("🗒️ Comentario automático")
-comment = make_comment_summary(
-    module="Series",
-    stats_dict={
-        "peak_month": ts.sort_values("usuarios", ascending=False).head(1).to_dict("records")
-    }
-)
-st.write(comment)
+    st.subheader("🗒️ Comentario automático")
+    with st.spinner("Generando comentario..."):
+        comment = comment_future.result()
+    st.write(comment)
@@ -0,0 +1,106 @@
+"""
+Generación por lotes (sin UI) de los reportes PPT/PDF de todas las instituciones.
+
+    python -m src.batch_reports --out reportes --formatos ppt pdf --workers 4
+
+Carga los datos una sola vez, reparte las instituciones en un pool de procesos y muestra
+el avance con el tiempo de cada institución.
+"""
+from __future__ import annotations
+import argparse
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from .io_load import load_raw, list_institutions
+from .reports import kpi_report
+from .transforms import kpi_cube
+from .export_ppt import export_ppt
+from .export_pdf import export_pdf
+
+FORMATS = ("ppt", "pdf")
+
+_RAW = None  # dataset del proceso (se carga una vez y se hereda/pasa a cada worker)
+
+def _init_worker(raw):
+    global _RAW
+    _RAW = raw
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "institucion"
+
+def build_institution_reports(institution: str, out_dir: str, formats: List[str], date_range=None) -> Dict[str, Any]:
+    """Genera los formatos pedidos para una institución; los errores se reportan, no cortan el lote."""
+    t0 = time.perf_counter()
+    result = {"institution": institution, "archivos": [], "errores": [], "tiempos": {}}
+    rep = kpi_report(_RAW, institution, date_range)
+    result["tiempos"]["datos"] = time.perf_counter() - t0
+
+    base = Path(out_dir) / f"Reporte_{_safe_name(institution)}"
+    if "ppt" in formats:
+        t = time.perf_counter()
+        try:
+            result["archivos"].append(export_ppt(institution, rep["kpis"], rep["figs"], rep["comments"], out_path=f"{base}.pptx"))
+        except Exception as e:
+            result["errores"].append(f"ppt: {e}")
+        result["tiempos"]["ppt"] = time.perf_counter() - t
+    if "pdf" in formats:
+        t = time.perf_counter()
+        try:
+            result["archivos"].append(export_pdf(institution, rep["kpis"], rep["figs"], rep["comments"], out_path=f"{base}.pdf"))
+        except Exception as e:
+            result["errores"].append(f"pdf: {e}")
+        result["tiempos"]["pdf"] = time.perf_counter() - t
+    result["tiempos"]["total"] = time.perf_counter() - t0
+    return result
+
+def _progress(i: int, n: int, res: Dict[str, Any]):
+    tiempos = "  ".join(f"{k} {v:.2f}s" for k, v in res["tiempos"].items())
+    estado = "ERROR " + "; ".join(res["errores"]) if res["errores"] else "ok"
+    print(f"[{i}/{n}] {res['institution']}: {tiempos}  ({estado})", flush=True)
+
+def run_batch(out_dir: str = "reportes", formats: List[str] = FORMATS, workers: int = 1,
+              date_range=None, institutions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Genera los reportes de `institutions` (por defecto todas las de list_institutions)."""
+    raw = load_raw()
+    kpi_cube(raw, date_range)  # KPIs de todas las instituciones en una pasada (los workers con fork lo heredan)
+    institutions = institutions or [x for x in list_institutions(raw["users"]) if x != "(sin datos)"]
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    n = len(institutions)
+    results = []
+    if workers <= 1:
+        _init_worker(raw)
+        for i, inst in enumerate(institutions, 1):
+            results.append(build_institution_reports(inst, out_dir, formats, date_range))
+            _progress(i, n, results[-1])
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(raw,)) as ex:
+        futs = [ex.submit(build_institution_reports, inst, out_dir, formats, date_range) for inst in institutions]
+        for i, fut in enumerate(as_completed(futs), 1):
+            results.append(fut.result())
+            _progress(i, n, results[-1])
+    return results
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Genera los reportes PPT/PDF de todas las instituciones.")
+    ap.add_argument("--out", default="reportes", help="directorio de salida")
+    ap.add_argument("--formatos", nargs="+", choices=FORMATS, default=list(FORMATS))
+    ap.add_argument("--workers", type=int, default=1, help="procesos en paralelo")
+    ap.add_argument("--desde", help="inicio del rango de registro (YYYY-MM-DD)")
+    ap.add_argument("--hasta", help="fin del rango de registro (YYYY-MM-DD)")
+    ap.add_argument("--instituciones", nargs="+", help="sólo estas instituciones")
+    args = ap.parse_args(argv)
+
+    date_range = (args.desde, args.hasta) if args.desde and args.hasta else None
+    t0 = time.perf_counter()
+    results = run_batch(args.out, args.formatos, args.workers, date_range, args.instituciones)
+    errores = sum(1 for r in results if r["errores"])
+    print(f"{len(results)} instituciones en {time.perf_counter() - t0:.1f}s ({errores} con errores) -> {args.out}/")
+    return 1 if errores else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Render de figuras Plotly a imagen (PNG/SVG) para los exportables.
+
+- Cache direccionada por contenido: la clave es el hash del JSON de la figura + formato/tamaño,
+  así una figura sin cambios nunca se renderiza dos veces (entre instituciones, sesiones o exports).
+- Los fallos de cache se renderizan en un pool acotado de hilos; cada hilo tiene su propio
+  proceso de kaleido (el scope global de plotly serializa los renders con un lock).
+"""
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from .memo import LRUCache
+
+RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))
+IMAGE_CACHE_SIZE = int(os.getenv("CHART_IMAGE_CACHE_SIZE", "256"))
+
+_IMAGES = LRUCache(IMAGE_CACHE_SIZE)
+_local = threading.local()
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _scope():
+    """Scope de kaleido del hilo actual (mismo plotly.js que usa plotly.io)."""
+    scope = getattr(_local, "scope", None)
+    if scope is None:
+        import plotly
+        from kaleido.scopes.plotly import PlotlyScope
+        scope = PlotlyScope()
+        scope.plotlyjs = os.path.join(os.path.dirname(os.path.abspath(plotly.__file__)), "package_data", "plotly.min.js")
+        _local.scope = scope
+    return scope
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, RENDER_WORKERS), thread_name_prefix="chart-render")
+        return _pool
+
+def image_key(fig_json: str, fmt: str, width: int, height: int, scale: float) -> str:
+    h = hashlib.sha256(f"{fmt}|{width}x{height}@{scale}|".encode())
+    h.update(fig_json.encode())
+    return h.hexdigest()
+
+def _render(fig_json: str, fmt: str, width: int, height: int, scale: float) -> bytes:
+    import json
+    return _scope().transform(json.loads(fig_json), format=fmt, width=width, height=height, scale=scale)
+
+def render_figures(figs: Dict[str, "plotly.graph_objs._figure.Figure"], fmt: str = "png",
+                   width: int = 1280, height: int = 720, scale: float = 2) -> Dict[str, Optional[bytes]]:
+    """
+    Devuelve {título: bytes de la imagen}; None si la figura no se pudo renderizar
+    (p. ej. sin 'kaleido'). Los aciertos de cache no pasan por kaleido.
+    """
+    out: Dict[str, Optional[bytes]] = {}
+    pending = {}
+    for title, fig in (figs or {}).items():
+        fig_json = fig.to_json()
+        key = image_key(fig_json, fmt, width, height, scale)
+        img = _IMAGES.get(key)
+        if img is not None:
+            out[title] = img
+        else:
+            pending[title] = (key, fig_json)
+
+    futs = {title: _executor().submit(_render, fig_json, fmt, width, height, scale)
+            for title, (key, fig_json) in pending.items()}
+    for title, fut in futs.items():
+        try:
+            out[title] = fut.result()
+            _IMAGES.put(pending[title][0], out[title])
+        except Exception:
+            out[title] = None
+    return {title: out[title] for title in (figs or {})}
+
+def render_figure(fig, fmt: str = "png", width: int = 1280, height: int = 720, scale: float = 2) -> Optional[bytes]:
+    return render_figures({"_": fig}, fmt, width, height, scale)["_"]
+
+def clear_image_cache() -> None:
+    _IMAGES.clear()
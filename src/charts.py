@@ -1,53 +1,150 @@
 import io
+import os
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import plotly.graph_objects as go  # plotly carga sus submódulos bajo demanda: importarlo es barato
 import streamlit as st
-from plotly.io import write_image
+from .profiling import timed
+
+# Desde cuántas filas los gráficos pasan a modo "muchos datos": WebGL, densidad en vez de puntos,
+# cuartiles precalculados y sólo una muestra de outliers (payload acotado hacia el navegador)
+LARGE_N_THRESHOLD = int(os.getenv("CHART_LARGE_N", "5000"))
+DENSITY_BINS = 60
+BOX_OUTLIER_SAMPLE = 300  # outliers por grupo que se dibujan en modo muchos datos
+
+def _px():
+    """plotly.express se importa al dibujar el primer gráfico, no al cargar la página (~0.1s en frío)."""
+    import plotly.express as px
+    return px
 
 def kpi_block(container, title: str, value):
     container.metric(label=title, value=value)
 
+@timed
 def bar_horizontal_pct(df: pd.DataFrame, y: str, x: str, title: str | None = None):
-    fig = px.bar(df, x=x, y=y, orientation="h", text=x)
+    fig = _px().bar(df, x=x, y=y, orientation="h", text=x)
     fig.update_traces(texttemplate="%{x:.1f}%", textposition="outside", cliponaxis=False)
     fig.update_layout(title=title or "", yaxis=dict(autorange="reversed"), xaxis_tickformat=".1f")
     return fig
 
+@timed
 def donut_chart(df: pd.DataFrame, title: str | None = None):
     if df.empty:
         return go.Figure()
-    fig = px.pie(df, values="count", names="label", hole=0.5)
+    fig = _px().pie(df, values="count", names="label", hole=0.5)
     fig.update_layout(title=title or "")
     return fig
 
+def ols_line(x, y):
+    """Recta de mínimos cuadrados (forma cerrada): (x extremos, y ajustados, pendiente, intercepto, r2) o None."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    ok = np.isfinite(x) & np.isfinite(y)
+    x, y = x[ok], y[ok]
+    if x.size < 2:
+        return None
+    dx, dy = x - x.mean(), y - y.mean()
+    sxx = float(dx @ dx)
+    if sxx == 0:
+        return None
+    slope = float(dx @ dy) / sxx
+    intercept = float(y.mean()) - slope * float(x.mean())
+    syy = float(dy @ dy)
+    r2 = (float(dx @ dy) ** 2 / (sxx * syy)) if syy else 1.0
+    xs = np.array([x.min(), x.max()])
+    return xs, intercept + slope * xs, slope, intercept, r2
+
+def _trend_trace(df: pd.DataFrame, x: str, y: str):
+    line = ols_line(df[x], df[y])
+    if line is None:
+        return None
+    xs, ys, slope, intercept, r2 = line
+    return go.Scattergl(x=xs, y=ys, mode="lines", name="Tendencia (OLS)", line=dict(color="#d62728"),
+                        hovertemplate=f"{y} = {slope:.4g}·{x} + {intercept:.4g}<br>R² = {r2:.3f}<extra></extra>")
+
+def _density_xy(df: pd.DataFrame, x: str, y: str):
+    """Histograma 2D precalculado con numpy: se envían DENSITY_BINS² celdas en vez de un punto por fila."""
+    xv, yv = df[x].to_numpy(dtype=float), df[y].to_numpy(dtype=float)
+    ok = np.isfinite(xv) & np.isfinite(yv)
+    counts, xe, ye = np.histogram2d(xv[ok], yv[ok], bins=DENSITY_BINS)
+    z = np.where(counts.T > 0, counts.T, np.nan)  # celdas vacías transparentes
+    fig = go.Figure(go.Heatmap(x=(xe[:-1] + xe[1:]) / 2, y=(ye[:-1] + ye[1:]) / 2, z=z,
+                               colorscale="Blues", colorbar=dict(title="Usuarios"),
+                               hovertemplate=f"{x}: %{{x:.3g}}<br>{y}: %{{y:.3g}}<br>Usuarios: %{{z}}<extra></extra>"))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+@timed
 def scatter_xy(df: pd.DataFrame, x: str, y: str, title: str | None = None):
     if df.empty:
         return go.Figure()
-    fig = px.scatter(df, x=x, y=y, trendline="ols")
-    fig.update_layout(title=title or "")
+    if len(df) > LARGE_N_THRESHOLD:
+        fig = _density_xy(df, x, y)
+    else:
+        fig = _px().scatter(df, x=x, y=y)
+    trend = _trend_trace(df, x, y)
+    if trend is not None:
+        fig.add_trace(trend)
+    fig.update_layout(title=title or "", showlegend=False)
+    return fig
+
+def _box_precomputed(df: pd.DataFrame, y: str, x: str):
+    """
+    Cajas con cuartiles calculados aquí (método lineal, como plotly) y bigotes a 1.5·IQR; de los
+    puntos sólo se dibuja una muestra de hasta BOX_OUTLIER_SAMPLE outliers por grupo, en WebGL.
+    """
+    rng = np.random.default_rng(0)
+    stats, out_x, out_y = [], [], []
+    for group, values in df.groupby(x, observed=True, sort=True)[y]:
+        v = values.to_numpy(dtype=float)
+        v = v[np.isfinite(v)]
+        if not v.size:
+            continue
+        q1, med, q3 = np.percentile(v, [25, 50, 75])
+        lo, hi = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        inside = v[(v >= lo) & (v <= hi)]
+        stats.append((str(group), q1, med, q3, inside.min(), inside.max(), v.mean()))
+        outliers = v[(v < lo) | (v > hi)]
+        if outliers.size > BOX_OUTLIER_SAMPLE:
+            outliers = rng.choice(outliers, BOX_OUTLIER_SAMPLE, replace=False)
+        out_x += [str(group)] * outliers.size
+        out_y += outliers.tolist()
+    if not stats:
+        return go.Figure()
+    g, q1, med, q3, lf, uf, mean = map(list, zip(*stats))
+    fig = go.Figure(go.Box(x=g, q1=q1, median=med, q3=q3, lowerfence=lf, upperfence=uf, mean=mean,
+                           name=y, boxpoints=False))
+    if out_y:
+        fig.add_trace(go.Scattergl(x=out_x, y=out_y, mode="markers", name="Outliers (muestra)",
+                                   marker=dict(size=4, opacity=0.5)))
+    fig.update_layout(xaxis_title=x, yaxis_title=y, showlegend=False)
     return fig
 
+@timed
 def boxplot(df: pd.DataFrame, y: str, x: str, title: str | None = None):
     if df.empty:
         return go.Figure()
-    fig = px.box(df, x=x, y=y, points="all")
+    if len(df) > LARGE_N_THRESHOLD:
+        fig = _box_precomputed(df, y, x)
+    else:
+        fig = _px().box(df, x=x, y=y, points="all")
     fig.update_layout(title=title or "")
     return fig
 
+@timed
 def area_timeseries(df: pd.DataFrame, x: str, y: str, title: str | None = None):
     if df.empty:
         return go.Figure()
-    fig = px.area(df, x=x, y=y)
+    fig = _px().area(df, x=x, y=y)
     fig.update_layout(title=title or "Altas por mes")
     return fig
 
+@timed
 def heatmap_matrix(df: pd.DataFrame, title: str | None = None):
     # df columns: skill_name, level, count
     if df.empty:
         return go.Figure()
     pivot = df.pivot(index="skill_name", columns="level", values="count").fillna(0)
-    fig = px.imshow(pivot, aspect="auto", labels=dict(x="Nivel", y="Skill", color="Usuarios"))
+    fig = _px().imshow(pivot, aspect="auto", labels=dict(x="Nivel", y="Skill", color="Usuarios"))
     fig.update_layout(title=title or "Mapa de calor")
     return fig
 
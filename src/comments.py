@@ -1,6 +1,30 @@
+import asyncio
+import hashlib
+import json
 import os
-from typing import Dict, Any
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
+from .profiling import timed, track_future
+
+load_dotenv()  # una vez al importar, no en cada rerun
+
+# "gemini" (por defecto), "stub" (modelo local determinista, para pruebas) u "off" (sólo fallback)
+COMMENTS_BACKEND = os.getenv("COMMENTS_BACKEND", "gemini").lower()
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+COMMENT_CACHE_PATH = Path(os.getenv("COMMENT_CACHE_PATH", "cache/comments.sqlite"))
+COMMENT_CACHE_SIZE = int(os.getenv("COMMENT_CACHE_SIZE", "1000"))
+COMMENT_CACHE_TTL = float(os.getenv("COMMENT_CACHE_TTL", str(7 * 24 * 3600)))  # segundos
+COMMENT_TIMEOUT = float(os.getenv("COMMENT_TIMEOUT", "10"))  # plazo por comentario (s), luego fallback
+COMMENT_CONCURRENCY = int(os.getenv("COMMENT_CONCURRENCY", "4"))  # llamadas simultáneas al modelo
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")  # p. ej. un servidor local compatible, para pruebas
+STUB_DELAY = float(os.getenv("COMMENTS_STUB_DELAY", "0"))  # latencia simulada del backend stub
+PROMPT_VERSION = 1  # subirlo si cambia el prompt, para no servir comentarios viejos
 
 def _fallback_comment(module: str, stats: Dict[str, Any]) -> str:
     """Comentario simple sin LLM."""
@@ -26,27 +50,188 @@ def _fallback_comment(module: str, stats: Dict[str, Any]) -> str:
         return f"El mayor número de registros ocurrió en {peak.get('month')} con {peak.get('usuarios')} usuarios."
     return "Resumen no disponible."
 
-def _try_gemini_comment(prompt: str) -> str:
-    try:
-        load_dotenv()
-        from google import genai  # requiere google-genai
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            return ""
-        client = genai.Client(api_key=api_key)
-        resp = client.models.generate_content(model="gemini-2.5-flash", contents=prompt)
-        return getattr(resp, "text", "").strip()
-    except Exception:
+class CommentCache:
+    """
+    Cache persistente (SQLite) de comentarios, compartida entre sesiones y procesos.
+    Expulsa por LRU al superar `maxsize` y descarta entradas con más de `ttl` segundos.
+    """
+    def __init__(self, path: Path = COMMENT_CACHE_PATH, maxsize: int = COMMENT_CACHE_SIZE, ttl: float = COMMENT_CACHE_TTL):
+        self.path = Path(path)
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @contextmanager
+    def _connect(self):
+        """Conexión corta por operación (commit al salir), segura entre hilos y procesos."""
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            conn.execute("CREATE TABLE IF NOT EXISTS comments (key TEXT PRIMARY KEY, module TEXT, model TEXT, "
+                         "text TEXT, created REAL, accessed REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS comments_accessed ON comments(accessed)")
+            self._ready = True
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT text, created FROM comments WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM comments WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE comments SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, module: str, model: str, text: str) -> None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?, ?, ?)", (key, module, model, text, now, now))
+            conn.execute("DELETE FROM comments WHERE created < ?", (now - self.ttl,))
+            conn.execute("DELETE FROM comments WHERE key NOT IN "
+                         "(SELECT key FROM comments ORDER BY accessed DESC LIMIT ?)", (self.maxsize,))
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM comments")
+
+    def __len__(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+
+_CACHE = CommentCache()
+
+def _json_default(o):
+    # Escalares de numpy/pandas -> nativos, para que 12 y np.int64(12) den el mismo hash
+    return o.item() if hasattr(o, "item") else str(o)
+
+def comment_key(module: str, model: str, stats: Dict[str, Any]) -> str:
+    """Hash canónico de (módulo, modelo, versión del prompt, estadísticas)."""
+    payload = json.dumps([module, model, PROMPT_VERSION, stats], sort_keys=True, default=_json_default,
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+_client = None
+_client_lock = threading.Lock()
+
+def _gemini_client():
+    """Cliente de Gemini reutilizado entre llamadas (None si no hay API key o librería)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                return None
+            from google import genai  # requiere google-genai
+            http_options = {"base_url": GEMINI_BASE_URL} if GEMINI_BASE_URL else None
+            _client = genai.Client(api_key=api_key, http_options=http_options)
+        return _client
+
+def _stub_comment(prompt: str) -> str:
+    """Modelo local determinista: permite probar cache y flujo sin llamar a la API."""
+    return f"[stub] Comentario generado localmente ({hashlib.sha256(prompt.encode()).hexdigest()[:8]})."
+
+async def _agenerate(model: str, prompt: str) -> str:
+    if model == "stub":
+        if STUB_DELAY:
+            await asyncio.sleep(STUB_DELAY)
+        return _stub_comment(prompt)
+    client = _gemini_client()
+    if client is None:
         return ""
+    resp = await client.aio.models.generate_content(model=model, contents=prompt)
+    return (getattr(resp, "text", "") or "").strip()
 
-def make_comment_summary(module: str, stats_dict: Dict[str, Any]) -> str:
-    """Intenta con Gemini si hay API; si no, usa fallback."""
-    prompt = (
+def _comment_prompt(module: str, stats_dict: Dict[str, Any]) -> str:
+    return (
         "Eres un analista de datos. Redacta un comentario breve (3-5 oraciones), claro y accionable, "
         f"sobre el módulo {module} con base en este resumen estadístico:\n{stats_dict}\n"
         "Incluye 1 recomendación concreta al final. Evita lenguaje sensacionalista."
     )
-    txt = _try_gemini_comment(prompt)
+
+# Un solo event loop en un hilo de fondo para todas las sesiones: reutiliza el cliente
+# y limita la concurrencia global con un semáforo.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_semaphore: Optional[asyncio.Semaphore] = None
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="comments-loop", daemon=True).start()
+        return _loop
+
+def _reset_after_fork():
+    # El hilo del loop no sobrevive a un fork: el hijo crea el suyo al primer uso
+    global _loop, _semaphore, _client
+    _loop, _semaphore, _client = None, None, None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+async def _limited(coro):
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, COMMENT_CONCURRENCY))
+    try:
+        async with _semaphore:
+            return await coro
+    finally:
+        coro.close()  # si el plazo vence en la cola, la corrutina nunca arrancó (no-op si terminó)
+
+async def _cached_generate(key: str, module: str, model: str, stats_dict: Dict[str, Any]) -> str:
+    """Cache -> modelo -> cache. SQLite corre en un hilo aparte para no frenar el loop compartido."""
+    try:
+        txt = await asyncio.to_thread(_CACHE.get, key)
+    except sqlite3.Error:  # cache bloqueada o corrupta: se sigue como si fuera un fallo de cache
+        txt = None
     if txt:
         return txt
-    return _fallback_comment(module, stats_dict)
+    txt = await _limited(_agenerate(model, _comment_prompt(module, stats_dict)))
+    if txt:
+        # Sólo se cachean respuestas del modelo; el fallback es barato y se recalcula
+        try:
+            await asyncio.to_thread(_CACHE.put, key, module, model, txt)
+        except sqlite3.Error:
+            pass
+    return txt
+
+async def comment_async(module: str, stats_dict: Dict[str, Any], timeout: Optional[float] = None) -> str:
+    """
+    Comentario del módulo: cache -> modelo (con límite de concurrencia) -> fallback.
+    Si no hay respuesta dentro de `timeout` segundos (cache, cola y modelo incluidos) se usa el fallback.
+    """
+    if COMMENTS_BACKEND == "off":
+        return _fallback_comment(module, stats_dict)
+    model = "stub" if COMMENTS_BACKEND == "stub" else GEMINI_MODEL
+    key = comment_key(module, model, stats_dict)
+    try:
+        txt = await asyncio.wait_for(_cached_generate(key, module, model, stats_dict),
+                                     COMMENT_TIMEOUT if timeout is None else timeout)
+    except Exception:  # incluye TimeoutError
+        txt = ""
+    return txt or _fallback_comment(module, stats_dict)
+
+def submit_comment(module: str, stats_dict: Dict[str, Any], timeout: Optional[float] = None) -> "Future[str]":
+    """Lanza el comentario en segundo plano y devuelve un Future (la página sigue renderizando)."""
+    fut = asyncio.run_coroutine_threadsafe(comment_async(module, stats_dict, timeout), _event_loop())
+    return track_future(f"comments.{module}", fut)
+
+@timed
+def make_comment_summaries(items: Dict[str, Dict[str, Any]], timeout: Optional[float] = None) -> Dict[str, str]:
+    """
+    Comentarios de varios módulos ({módulo: stats}) a la vez, en el loop compartido: mismo límite
+    de concurrencia y mismo plazo para todos (se lanzan juntos); los que no llegan, con fallback.
+    """
+    futs = {module: submit_comment(module, stats, timeout) for module, stats in items.items()}
+    return {module: fut.result() for module, fut in futs.items()}
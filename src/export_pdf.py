@@ -1,16 +1,72 @@
 from __future__ import annotations
-from typing import Dict, Any
+import base64
+import time
+from typing import Dict, Optional, Tuple, Any
 from pathlib import Path
+from datetime import datetime
 from jinja2 import Template
+from .chart_images import render_figures
+from .memo import LRUCache
 
-def export_pdf(context: Dict[str, Any], template_path: str = "templates/pdf_template.html", out_path: str = "Reporte.pdf"):
-    """Requiere weasyprint instalado en el sistema (y dependencias del SO)."""
+DEFAULT_TEMPLATE = Path("templates") / "pdf_template.html"
+PDF_MIME = "application/pdf"
+CHART_SIZE = (900, 500)  # px del SVG; al ser vectorial se escala al ancho de la página sin perder nitidez
+
+_TEMPLATES = LRUCache(maxsize=4)  # (ruta, mtime) -> Template compilado
+
+def _template(template_path=DEFAULT_TEMPLATE) -> Template:
+    """Plantilla compilada una vez por archivo; si el archivo cambia (mtime) se recompila."""
+    path = Path(template_path).resolve()
+    return _TEMPLATES.get_or_create((str(path), path.stat().st_mtime_ns),
+                                    lambda: Template(path.read_text(encoding="utf-8"), autoescape=True))
+
+def _svg_uri(svg: bytes) -> str:
+    return "data:image/svg+xml;base64," + base64.b64encode(svg).decode("ascii")
+
+def render_html(institution: str, kpis: dict, charts: Dict[str, Optional[bytes]], comments: str,
+                template_path=DEFAULT_TEMPLATE) -> str:
+    """HTML del reporte con los gráficos (SVG) embebidos como data URI; los que no tienen imagen se omiten."""
+    return _template(template_path).render(
+        institution=institution, date=f"{datetime.now():%Y-%m-%d}", kpis=kpis, comments=comments,
+        charts=[(title, _svg_uri(svg)) for title, svg in charts.items() if svg is not None])
+
+def export_pdf(institution: str, kpis: dict, figs: Dict[str, "plotly.graph_objs._figure.Figure"], comments: str,
+               out_path: Optional[str] = None, template_path=DEFAULT_TEMPLATE) -> str:
+    """
+    Exporta un PDF con KPIs, gráficos e interpretación. Devuelve la ruta absoluta del archivo.
+    Por defecto se guarda como Reporte_{institution}.pdf en el directorio actual.
+    """
+    data, _ = export_pdf_bytes(institution, kpis, figs, comments, template_path)
+    out = Path(out_path or f"Reporte_{institution}.pdf")
+    out.write_bytes(data)
+    return str(out.absolute())
+
+def export_pdf_bytes(institution: str, kpis: dict, figs: Dict[str, "plotly.graph_objs._figure.Figure"],
+                     comments: str, template_path=DEFAULT_TEMPLATE) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Igual que export_pdf pero todo en memoria: devuelve (bytes del .pdf, reporte) con las mismas
+    claves que export_ppt_bytes (render, armado = HTML, guardado = maquetado PDF) para compararlos.
+    Requiere weasyprint instalado en el sistema (y dependencias del SO).
+    """
     try:
-        from weasyprint import HTML
+        from weasyprint import HTML  # pesado: sólo se carga al exportar
     except Exception as e:
         raise RuntimeError("Para exportar a PDF instala weasyprint y sus dependencias.") from e
 
-    tpl = Path(template_path).read_text(encoding="utf-8")
-    html = Template(tpl).render(**context)
-    HTML(string=html).write_pdf(out_path)
-    return str(Path(out_path).absolute())
+    t0 = time.perf_counter()
+    charts = render_figures(figs, fmt="svg", width=CHART_SIZE[0], height=CHART_SIZE[1], scale=1)
+    t_render = time.perf_counter()
+    html = render_html(institution, kpis, charts, comments, template_path)
+    t_build = time.perf_counter()
+    data = HTML(string=html, base_url=str(Path(template_path).resolve().parent)).write_pdf()
+    t_save = time.perf_counter()
+    report = {
+        "bytes": len(data),
+        "graficos": len(charts),
+        "sin_imagen": sum(1 for svg in charts.values() if svg is None),
+        "render_s": t_render - t0,
+        "armado_s": t_build - t_render,
+        "guardado_s": t_save - t_build,
+        "total_s": t_save - t0,
+    }
+    return data, report
@@ -1,33 +1,66 @@
 from __future__ import annotations
-from typing import Dict
+import time
+from typing import Dict, Optional, Tuple, Any
 from pathlib import Path
 from datetime import datetime
-import tempfile
-import plotly.io as pio
-from pptx import Presentation
-from pptx.util import Inches
+from io import BytesIO
+from .chart_images import render_figures
 
 TEMPLATES_DIR = Path("templates")
 DEFAULT_TEMPLATE = TEMPLATES_DIR / "ppt_template.pptx"
 
-def _ensure_template() -> Path:
+def _ensure_template() -> Optional[Path]:
     """
-    Devuelve la plantilla si existe; si no, crea una muy básica automáticamente.
+    Devuelve la plantilla si existe; si no, None (python-pptx usa su plantilla básica
+    incorporada, sin escribir nada en disco).
     """
-    if DEFAULT_TEMPLATE.exists():
-        return DEFAULT_TEMPLATE
-    TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
-    prs = Presentation()
-    tmp = TEMPLATES_DIR / "_auto_template.pptx"
-    prs.save(tmp)
-    return tmp
+    return DEFAULT_TEMPLATE if DEFAULT_TEMPLATE.exists() else None
 
-def export_ppt(institution: str, kpis: dict, figs: Dict[str, "plotly.graph_objs._figure.Figure"], comments: str) -> str:
+PPT_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+def export_ppt(institution: str, kpis: dict, figs: Dict[str, "plotly.graph_objs._figure.Figure"], comments: str,
+               out_path: Optional[str] = None) -> str:
     """
     Exporta un PPT con portada, KPIs, gráficos e interpretación.
-    Devuelve la ruta absoluta del archivo generado (útil para st.download_button).
+    Devuelve la ruta absoluta del archivo generado.
+    Por defecto se guarda como Reporte_{institution}.pptx en el directorio actual.
     """
-    prs = Presentation(_ensure_template())
+    data, _ = export_ppt_bytes(institution, kpis, figs, comments)
+    out = Path(out_path or f"Reporte_{institution}.pptx")
+    out.write_bytes(data)
+    return str(out.absolute())
+
+def export_ppt_bytes(institution: str, kpis: dict, figs: Dict[str, "plotly.graph_objs._figure.Figure"],
+                     comments: str) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Igual que export_ppt pero todo en memoria: devuelve (bytes del .pptx, reporte) listo
+    para st.download_button. El reporte trae tamaño y tiempos (render, armado, guardado).
+    """
+    t0 = time.perf_counter()
+    images = render_figures(figs, fmt="png", width=1280, height=720, scale=2)
+    t_render = time.perf_counter()
+    prs = _build_presentation(institution, kpis, images, comments)
+    t_build = time.perf_counter()
+    buf = BytesIO()
+    prs.save(buf)
+    data = buf.getvalue()
+    t_save = time.perf_counter()
+    report = {
+        "bytes": len(data),
+        "graficos": len(images),
+        "sin_imagen": sum(1 for img in images.values() if img is None),
+        "render_s": t_render - t0,
+        "armado_s": t_build - t_render,
+        "guardado_s": t_save - t_build,
+        "total_s": t_save - t0,
+    }
+    return data, report
+
+def _build_presentation(institution: str, kpis: dict, images: Dict[str, Optional[bytes]], comments: str):
+    from pptx import Presentation  # python-pptx sólo se carga al exportar (~0.2s en frío)
+    from pptx.util import Inches
+    template = _ensure_template()
+    prs = Presentation(str(template) if template else None)
 
     # Portada
     slide = prs.slides.add_slide(prs.slide_layouts[0])
@@ -52,22 +85,16 @@ def export_ppt(institution: str, kpis: dict, figs: Dict[str, "plotly.graph_objs.
         f"Salario mediano: S/ {kpis.get('sal_mediana', 0):.0f}"
     )
 
-    # Gráficos
-    for title, fig in (figs or {}).items():
+    # Gráficos (ya renderizados; None si no se pudo)
+    for title, img in images.items():
         slide = prs.slides.add_slide(prs.slide_layouts[5])
         slide.shapes.title.text = title
-        img_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                # Requiere 'kaleido' instalado en el entorno
-                pio.write_image(fig, tmp.name, width=1280, height=720, scale=2)
-                img_path = tmp.name
-        except Exception:
+        if img is None:
             # Si no hay kaleido o falla el render, dejamos una nota
             tf = slide.shapes.add_textbox(Inches(0.7), Inches(1.5), Inches(9), Inches(3)).text_frame
             tf.text = "(No se pudo exportar el gráfico como imagen. Instala 'kaleido' para incluir gráficos en el PPT.)"
-        if img_path:
-            slide.shapes.add_picture(img_path, Inches(0.7), Inches(1.5), Inches(9), Inches(5))
+        else:
+            slide.shapes.add_picture(BytesIO(img), Inches(0.7), Inches(1.5), Inches(9), Inches(5))
 
     # Comentarios / narrativa
     slide = prs.slides.add_slide(prs.slide_layouts[5])
@@ -76,6 +103,4 @@ def export_ppt(institution: str, kpis: dict, figs: Dict[str, "plotly.graph_objs.
     tf.word_wrap = True
     tf.text = comments or "(Sin comentarios)"
 
-    out = Path(f"Reporte_{institution}.pptx")
-    prs.save(out)
-    return str(out.absolute())
+    return prs
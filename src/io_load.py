@@ -1,15 +1,38 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Tuple, List
+from typing import Callable, Dict, Optional, Tuple, List, Iterable, Iterator
+import hashlib
+import json
+import multiprocessing as mp
+import pickle
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import pandas as pd
 import numpy as np
 import os
 import streamlit as st
+from .memo import LRUCache
+from .profiling import timed
 
-DATA_DIR = Path("data")
-CACHE_DIR = Path("cache")
+DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
+CACHE_DIR = Path(os.getenv("CACHE_DIR", "cache"))
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
+# Altas/cambios diarios: <tabla>[_sufijo].xlsx|csv|parquet (también en subcarpetas por día)
+DELTA_DIR = Path(os.getenv("DELTA_DIR", str(DATA_DIR / "deltas")))
+DELTA_SUFFIXES = (".xlsx", ".csv", ".parquet")
+
+# Procesos para parsear Excel en paralelo en load_raw (1 = en serie)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+# Excel de al menos este tamaño se leen en streaming (openpyxl read-only) por bloques de filas
+EXCEL_STREAM_MIN_MB = float(os.getenv("EXCEL_STREAM_MIN_MB", "25"))
+EXCEL_STREAM_CHUNK_ROWS = int(os.getenv("EXCEL_STREAM_CHUNK_ROWS", "50000"))
+# Vistas filtradas (institución, rango) que se mantienen en memoria
+VIEW_CACHE_SIZE = int(os.getenv("VIEW_CACHE_SIZE", "32"))
 
 REQUIRED = {
     "users": [
@@ -39,6 +62,51 @@ REQUIRED = {
     ],
 }
 
+TABLE_FILES = {
+    "users": "users.xlsx",
+    "workexperiences": "workexperiences.xlsx",
+    "educations": "educations.xlsx",
+    "onboardings": "onboardings.xlsx",
+    "skills": "skills.xlsx",
+    "languages": "languages.xlsx",
+}
+
+# Tipado por tabla (se aplica tras validar columnas)
+DATE_COLS = {
+    "users": ["registration_date"],
+    "workexperiences": ["start_date", "end_date"],
+    "educations": ["start_date", "end_date"],
+}
+NUMERIC_COLS = {
+    "workexperiences": ["duration_months"],
+    "educations": ["gpa"],
+    "onboardings": ["salario_expect_min", "salario_expect_max"],
+    "skills": ["level"],
+}
+TEXT_COLS = {
+    "users": ["full_name","email","phone","institution_name","gender",
+              "current_role","status_academic","modality_preference",
+              "highest_education","program_or_major","campus","country","region","city"],
+    "skills": ["skill_name","skill_type"],
+    "languages": ["lang_code","level"],
+}
+
+# Esquema compacto (COMPACT_DTYPES=0 lo desactiva): texto de baja cardinalidad como category,
+# el resto del texto como string de Arrow, numéricos reducidos y user_id con el entero más chico
+COMPACT_DTYPES = os.getenv("COMPACT_DTYPES", "1") != "0"
+CATEGORY_COLS = {
+    "users": ["institution_name","campus","country","region","city","gender","current_role",
+              "status_academic","modality_preference","highest_education","program_or_major"],
+    "workexperiences": ["position_title","industry_sector"],
+    "educations": ["institution_academic","degree_level","program_or_major"],
+    "onboardings": ["oportunidad_buscada","rol_identificado"],
+    "skills": ["skill_name","skill_type"],
+    "languages": ["lang_code","level"],
+}
+
+# Subir cuando cambie el tipado/validación: invalida todos los snapshots de cache/
+SNAPSHOT_VERSION = 3
+
 @st.cache_data(show_spinner=False)
 def _read_excel(path: Path, sheet: Optional[str] = None) -> pd.DataFrame:
     df = pd.read_excel(path, sheet_name=sheet or 0)
@@ -47,7 +115,7 @@ def _read_excel(path: Path, sheet: Optional[str] = None) -> pd.DataFrame:
 def _coerce_dates(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
     for c in cols:
         if c in df.columns:
-            df[c] = pd.to_datetime(df[c], errors="coerce").dt.date
+            df[c] = pd.to_datetime(df[c], errors="coerce")
     return df
 
 def _coerce_numeric(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
@@ -67,55 +135,551 @@ def _validate_columns(df: pd.DataFrame, required: List[str], name: str):
     if missing:
         raise ValueError(f"Faltan columnas en {name}: {missing}")
 
-@st.cache_data(show_spinner=False)
-def load_raw() -> Dict[str, pd.DataFrame]:
-    """Carga los 6 Excel a DataFrames con tipado/validación básica y cache de Streamlit."""
-    paths = {
-        "users": DATA_DIR / "users.xlsx",
-        "workexperiences": DATA_DIR / "workexperiences.xlsx",
-        "educations": DATA_DIR / "educations.xlsx",
-        "onboardings": DATA_DIR / "onboardings.xlsx",
-        "skills": DATA_DIR / "skills.xlsx",
-        "languages": DATA_DIR / "languages.xlsx",
-    }
-    dfs = {k: _read_excel(p) for k, p in paths.items()}
+def _compact_table(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica el esquema compacto a una tabla ya tipada."""
+    for c in df.columns:
+        s = df[c]
+        if c in CATEGORY_COLS.get(name, []):
+            df[c] = s.astype("category")
+        elif s.dtype == object:
+            if pd.api.types.infer_dtype(s, skipna=True) == "string":
+                df[c] = s.astype("string[pyarrow]")
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            df[c] = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s) and c != "user_id":
+            df[c] = pd.to_numeric(s, downcast="float")
+    return df
+
+def _encode_user_ids(dfs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """user_id no numérico -> category con las mismas categorías (códigos enteros) en todas las tablas."""
+    if all(pd.api.types.is_numeric_dtype(df["user_id"]) for df in dfs.values()):
+        return dfs
+    ids = pd.concat([df["user_id"].astype(str) for df in dfs.values()]).dropna().unique()
+    dtype = pd.CategoricalDtype(sorted(ids))
+    return {name: df.assign(user_id=df["user_id"].astype(str).astype(dtype)) for name, df in dfs.items()}
+
+def _prepare_table(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Valida columnas y aplica el tipado de fechas, numéricos y texto de una tabla."""
+    _validate_columns(df, REQUIRED[name], name)
+    df = _coerce_dates(df, DATE_COLS.get(name, []))
+    df = _coerce_numeric(df, NUMERIC_COLS.get(name, []))
+    df = _fillna_text(df, TEXT_COLS.get(name, []))
+    if COMPACT_DTYPES:
+        df = _compact_table(name, df)
+    return df
+
+def _snapshot_schema() -> str:
+    return f"{SNAPSHOT_VERSION}{'c' if COMPACT_DTYPES else ''}"
+
+def _read_parquet(path: Path) -> pd.DataFrame:
+    if not COMPACT_DTYPES:
+        return pd.read_parquet(path)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    # las categorías vuelven vía metadata de pandas; el texto se lee directo como string de Arrow
+    arrow_str = pd.StringDtype("pyarrow")
+    df = pq.read_table(path).to_pandas(types_mapper={pa.string(): arrow_str, pa.large_string(): arrow_str}.get)
+    for c in df.columns:
+        # diccionarios escritos por bloques (_stream_table) vuelven en orden de aparición
+        if isinstance(df[c].dtype, pd.CategoricalDtype) and not df[c].cat.categories.is_monotonic_increasing:
+            df[c] = df[c].cat.reorder_categories(df[c].cat.categories.sort_values())
+    return df
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _file_fingerprint(path: Path, known: Optional[dict] = None) -> dict:
+    """size + mtime + sha256 del archivo. Si size/mtime coinciden con `known` se reutiliza su hash."""
+    stat = path.stat()
+    fp = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if known and known.get("size") == fp["size"] and known.get("mtime_ns") == fp["mtime_ns"]:
+        fp["sha256"] = known.get("sha256")
+    else:
+        fp["sha256"] = _sha256(path)
+    return fp
+
+def _snapshot_paths(name: str) -> Tuple[Path, Path]:
+    return CACHE_DIR / f"{name}.parquet", CACHE_DIR / f"{name}.json"
+
+def _read_snapshot_meta(meta_path: Path) -> Optional[dict]:
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+_UMASK = os.umask(0)  # se lee una vez al importar (os.umask sólo se puede leer cambiándolo)
+os.umask(_UMASK)
+
+def _temp_path(target: Path) -> Path:
+    """
+    Temporal único junto a `target` (mismo disco => os.replace atómico); uno por escritor, así
+    dos procesos que regeneran el mismo snapshot no se pisan el archivo a medio escribir. Lleva
+    los permisos de un archivo normal (0666 & ~umask; NamedTemporaryFile crea 0600), para que la
+    cache se pueda compartir entre usuarios (CLI de lotes y app).
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp", delete=False) as f:
+        os.chmod(f.name, 0o666 & ~_UMASK)
+        return Path(f.name)
+
+def _write_snapshot_meta(meta_path: Path, fp: dict):
+    tmp = _temp_path(meta_path)
+    try:
+        tmp.write_text(json.dumps({"version": _snapshot_schema(), "source": fp}), encoding="utf-8")
+        os.replace(tmp, meta_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def _write_snapshot(name: str, df: pd.DataFrame, fp: dict):
+    """Escribe el snapshot columnar (Parquet) de forma atómica; si falla, sólo se pierde la cache."""
+    snap, meta_path = _snapshot_paths(name)
+    tmp = _temp_path(snap)
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, snap)
+        _write_snapshot_meta(meta_path, fp)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+
+def _read_snapshot(name: str, path: Path) -> Tuple[Optional[pd.DataFrame], dict]:
+    """
+    Devuelve (tabla, huella): la tabla tipada desde su snapshot en cache/ si la huella del
+    Excel coincide, o None si hay que re-parsearlo.
+    """
+    snap, meta_path = _snapshot_paths(name)
+    meta = _read_snapshot_meta(meta_path)
+    known = meta.get("source") if meta and meta.get("version") == _snapshot_schema() else None
+    fp = _file_fingerprint(path, known)
+
+    if known and known.get("sha256") == fp["sha256"] and snap.exists():
+        try:
+            df = _read_parquet(snap)
+            if known != fp:
+                # mismo contenido con otro mtime (p.ej. copiado): sólo se actualiza la huella
+                _write_snapshot_meta(meta_path, fp)
+            return df, fp
+        except Exception:
+            pass
+    return None, fp
+
+def _iter_excel_chunks(path: Path, name: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Bloques de hasta `chunk_rows` filas de la primera hoja, leída con openpyxl en modo read-only
+    (sin árbol de celdas en memoria). Las celdas se convierten como en pd.read_excel: enteros
+    guardados como float vuelven como int, errores de fórmula como nulos y se descartan las
+    filas vacías del final.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import ERROR_CODES
+
+    def cell(v):
+        if isinstance(v, float) and v.is_integer():
+            return int(v)
+        if isinstance(v, str) and v in ERROR_CODES:
+            return None
+        return v
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        columns = [f"Unnamed: {i}" if c is None else str(c) for i, c in enumerate(header)]
+        _validate_columns(pd.DataFrame(columns=columns), REQUIRED[name], name)
+        width, block, emitted, blank = len(columns), [], False, 0
+        for row in rows:
+            if not any(v is not None for v in row):
+                blank += 1  # como read_excel: se conservan salvo al final de la hoja
+                continue
+            block.extend([[None] * width] * blank)
+            blank = 0
+            row = [cell(v) for v in row[:width]]
+            block.append(row + [None] * (width - len(row)))
+            if len(block) >= chunk_rows:
+                yield pd.DataFrame.from_records(block, columns=columns)
+                block, emitted = [], True
+        if block or not emitted:
+            yield pd.DataFrame.from_records(block, columns=columns)
+    finally:
+        wb.close()
+
+def _prepare_chunk(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Tipado de _prepare_table sobre un bloque; el esquema compacto se decide al final con todos los bloques."""
+    df = _coerce_dates(df, DATE_COLS.get(name, []))
+    df = _coerce_numeric(df, NUMERIC_COLS.get(name, []))
+    df = _fillna_text(df, TEXT_COLS.get(name, []))
+    for c in df.columns:
+        if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True) not in ("string", "empty"):
+            df[c] = df[c].map(lambda v: v if v is None or v != v else str(v))  # mixto -> texto (Arrow no admite mixtos)
+    return df
+
+def _final_arrow_type(name: str, col: str, types: List, float32_ok: bool, int_range: Tuple[int, int]):
+    """Tipo Arrow de una columna tras ver todos los bloques, equivalente al de _prepare_table."""
+    import pyarrow as pa
+    seen = {t for t in types if not pa.types.is_null(t)}
+    if not seen:
+        t = pa.string() if col in CATEGORY_COLS.get(name, []) else pa.float64()
+    elif len(seen) == 1:
+        t = seen.pop()
+    elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in seen):
+        t = pa.float64()
+    else:
+        t = pa.string()
+    if not COMPACT_DTYPES:
+        return t
+    if col in CATEGORY_COLS.get(name, []):
+        return pa.dictionary(pa.int32(), t)
+    if pa.types.is_integer(t):
+        lo, hi = int_range
+        return next(it for it in (pa.int8(), pa.int16(), pa.int32(), pa.int64())
+                    if np.iinfo(it.to_pandas_dtype()).min <= lo and hi <= np.iinfo(it.to_pandas_dtype()).max)
+    if pa.types.is_floating(t) and col != "user_id" and float32_ok:
+        return pa.float32()
+    return t
+
+def _stream_table(name: str, path: Path, fp: dict, chunk_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Excel -> snapshot Parquet sin tener el libro ni la tabla completa en memoria: cada bloque se
+    tipa/valida y se escribe como parte en cache/; con todas las partes vistas se fija el esquema
+    (mismos tipos que _prepare_table) y se vuelcan con un ParquetWriter al snapshot, una parte a la
+    vez. La tabla final se lee del snapshot como en un arranque en caliente.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    snap, meta_path = _snapshot_paths(name)
+    tmp = _temp_path(snap)
+    parts_dir = Path(tempfile.mkdtemp(dir=CACHE_DIR, prefix=f".{name}.parts."))
+    try:
+        parts, types, float32_ok, int_range = [], {}, {}, {}
+        for i, chunk in enumerate(_iter_excel_chunks(path, name, chunk_rows or EXCEL_STREAM_CHUNK_ROWS)):
+            chunk = _prepare_chunk(name, chunk)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            for c in chunk.columns:
+                s = chunk[c]
+                types.setdefault(c, []).append(table.schema.field(c).type)
+                if pd.api.types.is_float_dtype(s):
+                    float32_ok[c] = float32_ok.get(c, True) and pd.to_numeric(s, downcast="float").dtype == np.float32
+                elif pd.api.types.is_integer_dtype(s) and len(s):
+                    lo, hi = int_range.get(c, (0, 0))
+                    int_range[c] = (min(lo, int(s.min())), max(hi, int(s.max())))
+            part = parts_dir / f"{i:05d}.parquet"
+            pq.write_table(table, part)
+            parts.append(part)
+            del chunk, table
+
+        schema = pa.schema([(c, _final_arrow_type(name, c, t, float32_ok.get(c, True), int_range.get(c, (0, 0))))
+                            for c, t in types.items()])
+        with pq.ParquetWriter(tmp, schema) as writer:
+            for part in parts:
+                table = pq.read_table(part)
+                writer.write_table(pa.table([table[c].cast(schema.field(c).type) for c in schema.names], schema=schema))
+        os.replace(tmp, snap)
+        _write_snapshot_meta(meta_path, fp)
+    finally:
+        tmp.unlink(missing_ok=True)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    return _read_parquet(snap)
 
-    # Validar
-    for name, df in dfs.items():
-        _validate_columns(df, REQUIRED[name], name)
+def _should_stream(path: Path) -> bool:
+    return path.suffix.lower() == ".xlsx" and path.stat().st_size >= EXCEL_STREAM_MIN_MB * 2**20
 
-    # Tipado: fechas y numericos
-    dfs["users"] = _coerce_dates(dfs["users"], ["registration_date"])
-    dfs["workexperiences"] = _coerce_dates(dfs["workexperiences"], ["start_date", "end_date"])
-    dfs["educations"] = _coerce_dates(dfs["educations"], ["start_date", "end_date"])
+def _build_table(name: str, path: Path, fp: dict, reader=_read_excel) -> pd.DataFrame:
+    """Parsea el Excel, tipa/valida y regenera sólo el snapshot de esa tabla (en streaming si es grande)."""
+    if _should_stream(path):
+        return _stream_table(name, path, fp)
+    df = _prepare_table(name, reader(path))
+    _write_snapshot(name, df, fp)
+    return df
+
+def _build_tables_parallel(pending: Dict[str, Tuple[Path, dict]], workers: int) -> Dict[str, pd.DataFrame]:
+    """Parsea y tipa varios Excel en un pool de procesos (openpyxl es CPU-bound)."""
+    ctx = mp.get_context("spawn")  # sin fork: el servidor de Streamlit tiene hilos vivos
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=ctx) as ex:
+        futs = {name: ex.submit(_build_table, name, path, fp, pd.read_excel) for name, (path, fp) in pending.items()}
+        return {name: f.result() for name, f in futs.items()}
+
+@st.cache_resource(show_spinner=False)
+def load_base(workers: Optional[int] = None) -> RawData:
+    """
+    Carga los 6 Excel a DataFrames con tipado/validación básica y cache de Streamlit.
+    Cada tabla tipada se guarda como snapshot Parquet en cache/, invalidado por la huella
+    (tamaño, mtime y hash) de su Excel, de modo que un arranque en frío no re-parsea Excel.
+    Con `workers` > 1 (por defecto INGEST_WORKERS) los Excel a re-parsear se procesan en
+    paralelo; si el pool no está disponible se vuelve a la carga en serie.
+    Se cachea como recurso: todas las sesiones comparten una sola copia (de sólo lectura).
+    """
+    workers = INGEST_WORKERS if workers is None else workers
+    dfs: Dict[str, pd.DataFrame] = {}
+    pending: Dict[str, Tuple[Path, dict]] = {}
+    hashes: Dict[str, str] = {}
+    for name, fname in TABLE_FILES.items():
+        path = DATA_DIR / fname
+        df, fp = _read_snapshot(name, path)
+        hashes[name] = fp["sha256"]
+        if df is None:
+            pending[name] = (path, fp)
+        else:
+            dfs[name] = df
+
+    if workers > 1 and len(pending) > 1:
+        try:
+            dfs.update(_build_tables_parallel(pending, workers))
+        except (BrokenProcessPool, OSError, pickle.PicklingError):
+            pass  # fallback a la ruta en serie
+    for name, (path, fp) in pending.items():
+        if name not in dfs:
+            dfs[name] = _build_table(name, path, fp)
+
+    version = hashlib.sha256(json.dumps([_snapshot_schema(), hashes], sort_keys=True).encode()).hexdigest()[:16]
+    return index_tables(_encode_user_ids({name: dfs[name] for name in TABLE_FILES}), version=version)
+
+@timed
+def _delta_files() -> Tuple[Tuple[str, str, int, int], ...]:
+    """(tabla, ruta relativa, tamaño, mtime) de los deltas en DELTA_DIR, en orden de nombre."""
+    if not DELTA_DIR.is_dir():
+        return ()
+    out = []
+    for path in sorted(DELTA_DIR.rglob("*")):
+        table = path.stem.split("_", 1)[0]
+        if path.suffix.lower() in DELTA_SUFFIXES and table in TABLE_FILES and path.is_file():
+            stat = path.stat()
+            out.append((table, str(path.relative_to(DELTA_DIR)), stat.st_size, stat.st_mtime_ns))
+    return tuple(out)
+
+def read_delta(path: Path) -> pd.DataFrame:
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    if suffix == ".csv":
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+_DELTA_STATE: Dict[str, object] = {}  # base, files y raw del último dataset base + deltas
+_DELTA_LOCK = threading.Lock()
+
+@timed
+def load_raw(workers: Optional[int] = None) -> RawData:
+    """
+    Dataset base (load_base, cacheado) más los deltas de DELTA_DIR. Los deltas se revisan en cada
+    llamada (sólo stat de archivos): si aparecieron archivos nuevos después de los ya aplicados
+    se aplican sólo esos sobre el dataset anterior; si cambió o se quitó alguno se re-aplican
+    todos sobre la base. Las caches derivadas se migran vía apply_deltas.
+    """
+    base = load_base(workers)
+    files = _delta_files()
+    if not files:
+        return base
+    with _DELTA_LOCK:
+        state = _DELTA_STATE
+        if state.get("base") == base.version and state["files"] == files:
+            return state["raw"]
+        done = state.get("files", ()) if state.get("base") == base.version else ()
+        if done and files[:len(done)] == done:
+            raw, new_files = state["raw"], files[len(done):]
+        else:
+            raw, new_files = base, files
+        version = hashlib.sha256(json.dumps([raw.version, new_files]).encode()).hexdigest()[:16]
+        raw = apply_deltas(raw, [(table, read_delta(DELTA_DIR / rel)) for table, rel, _, _ in new_files], version=version)
+        state.update(base=base.version, files=files, raw=raw)
+        return raw
+
+def _clear_loaded():
+    load_base.clear()
+    with _DELTA_LOCK:
+        _DELTA_STATE.clear()
 
-    dfs["workexperiences"] = _coerce_numeric(dfs["workexperiences"], ["duration_months"])
-    dfs["educations"] = _coerce_numeric(dfs["educations"], ["gpa"])
-    dfs["onboardings"] = _coerce_numeric(dfs["onboardings"], ["salario_expect_min", "salario_expect_max"])
-    dfs["skills"] = _coerce_numeric(dfs["skills"], ["level"])
+load_raw.clear = _clear_loaded
 
-    # Texto: no nulos
-    dfs["users"] = _fillna_text(dfs["users"], ["full_name","email","phone","institution_name","gender",
-                                               "current_role","status_academic","modality_preference",
-                                               "highest_education","program_or_major","campus","country","region","city"])
-    dfs["skills"] = _fillna_text(dfs["skills"], ["skill_name","skill_type"])
-    dfs["languages"] = _fillna_text(dfs["languages"], ["lang_code","level"])
+# Funciones (anterior, nuevo, instituciones afectadas) que migran caches derivadas tras un delta
+_DELTA_HOOKS: List[Callable[["RawData", "RawData", set], None]] = []
 
-    return dfs
+def register_delta_hook(fn: Callable[["RawData", "RawData", set], None]):
+    _DELTA_HOOKS.append(fn)
+    return fn
 
+def _concat_aligned(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """concat que conserva las columnas category (unión de categorías en vez de caer a object)."""
+    b = b[a.columns]
+    for c in a.columns:
+        if isinstance(a[c].dtype, pd.CategoricalDtype) or isinstance(b[c].dtype, pd.CategoricalDtype):
+            cats = a[c].astype("category").cat.categories
+            new = pd.Index(b[c].dropna().unique()).difference(cats)
+            dtype = pd.CategoricalDtype(cats.append(new.sort_values()) if len(new) else cats)
+            a, b = a.assign(**{c: a[c].astype(dtype)}), b.assign(**{c: b[c].astype(dtype)})
+    return pd.concat([a, b], ignore_index=True)
+
+@timed
+def apply_deltas(raw: RawData, deltas: Iterable[Tuple[str, pd.DataFrame]], version: Optional[str] = None) -> RawData:
+    """
+    Upsert por user_id: cada delta (tabla, filas) trae las filas completas de esos usuarios en esa
+    tabla y reemplaza las que había (usuarios nuevos se agregan). Devuelve un dataset nuevo con otra
+    versión (raw no se modifica) y llama a los hooks registrados con las instituciones afectadas
+    (las de esos usuarios antes y después), para que actualicen sólo lo que cambió.
+    """
+    tables = {name: raw[name] for name in TABLE_FILES}
+    touched = []
+    for name, delta in deltas:
+        delta = _prepare_table(name, delta.copy())
+        if delta.empty:
+            continue
+        base = tables[name]
+        if isinstance(base["user_id"].dtype, pd.CategoricalDtype):
+            delta["user_id"] = delta["user_id"].astype(str)
+            base = base.assign(user_id=base["user_id"].astype(str))
+        ids = delta["user_id"].unique()
+        touched.append(ids)
+        was_sorted = base["user_id"].is_monotonic_increasing
+        merged = _concat_aligned(base[~base["user_id"].isin(ids)], delta)
+        if was_sorted:
+            merged = merged.sort_values("user_id", kind="stable", ignore_index=True)
+        tables[name] = merged
+    if not touched:
+        return raw
+
+    ids = np.unique(np.concatenate([np.asarray(t, dtype=object) for t in touched]))
+    def institutions_of(users: pd.DataFrame) -> set:
+        users_ids = users["user_id"].astype(str) if isinstance(users["user_id"].dtype, pd.CategoricalDtype) else users["user_id"]
+        return set(users.loc[users_ids.isin(ids), "institution_name"].dropna().astype(str))
+    affected = institutions_of(raw["users"]) | institutions_of(tables["users"])
+
+    new = index_tables(_encode_user_ids(tables), version=version)
+    for hook in _DELTA_HOOKS:
+        hook(raw, new, affected)
+    return new
+
+def memory_report(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Memoria residente (deep) por tabla, para seguir el efecto del esquema compacto."""
+    rows = [
+        {"tabla": name, "filas": int(df.shape[0]), "columnas": int(df.shape[1]),
+         "mb": round(df.memory_usage(deep=True).sum() / 2**20, 3)}
+        for name, df in dfs.items()
+    ]
+    out = pd.DataFrame(rows)
+    total = {"tabla": "total", "filas": int(out["filas"].sum()), "columnas": int(out["columnas"].sum()), "mb": round(out["mb"].sum(), 3)}
+    return pd.concat([out, pd.DataFrame([total])], ignore_index=True)
+
+@timed
 def list_institutions(users_df: pd.DataFrame) -> List[str]:
     lst = sorted([x for x in users_df["institution_name"].dropna().unique().tolist() if str(x).strip()])
     return lst or ["(sin datos)"]
 
+CHILD_TABLES = ["workexperiences", "educations", "onboardings", "skills", "languages"]
+
+@dataclass
+class PartitionIndex:
+    """
+    Índice posicional construido una vez al cargar: institución -> filas de users y
+    user_id -> rango de filas en cada tabla hija (ordenadas por user_id).
+    """
+    n_users: int
+    by_institution: Dict[str, np.ndarray]
+    user_ids: np.ndarray
+    registration: np.ndarray  # datetime64[ns], alineado con las filas de users
+    child_user_ids: Dict[str, np.ndarray]
+    no_orphans: Dict[str, bool]  # tabla hija -> todas sus filas tienen un user_id presente en users
+
+    def user_positions(self, institution: Optional[str], dates: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> np.ndarray:
+        if institution:
+            pos = self.by_institution.get(institution, np.empty(0, dtype=np.int64))
+        else:
+            pos = np.arange(self.n_users, dtype=np.int64)
+        if dates is not None:
+            reg = self.registration[pos]
+            start, end = dates
+            pos = pos[(reg >= start.to_datetime64()) & (reg < (end + pd.Timedelta(days=1)).to_datetime64())]
+        return pos
+
+    def child_rows(self, name: str, user_ids: np.ndarray) -> np.ndarray:
+        """Posiciones de las filas de `name` para `user_ids` (únicos y ordenados)."""
+        cu = self.child_user_ids[name]
+        lo = np.searchsorted(cu, user_ids, side="left")
+        lens = np.searchsorted(cu, user_ids, side="right") - lo
+        keep = lens > 0
+        lo, lens = lo[keep], lens[keep]
+        if lo.size == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.repeat(lo - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+
+class RawData(dict):
+    """
+    Dict de tablas (como lo devuelve load_raw) que además lleva su índice de particiones y una
+    versión del dataset, usada como clave por las caches de vistas y agregados derivados.
+    """
+    partition: Optional[PartitionIndex] = None
+    version: str = ""
+
+def build_partition_index(dfs: Dict[str, pd.DataFrame]) -> PartitionIndex:
+    users = dfs["users"]
+    by_inst = {k: np.asarray(v, dtype=np.int64) for k, v in users.groupby("institution_name", sort=False, observed=True).indices.items()}
+    user_ids = users["user_id"].to_numpy()
+    child_user_ids = {name: dfs[name]["user_id"].to_numpy() for name in CHILD_TABLES}
+    return PartitionIndex(
+        n_users=int(users.shape[0]),
+        by_institution=by_inst,
+        user_ids=user_ids,
+        registration=users["registration_date"].to_numpy("datetime64[ns]"),
+        child_user_ids=child_user_ids,
+        no_orphans={name: bool(np.isin(pd.unique(cu), user_ids).all()) for name, cu in child_user_ids.items()},
+    )
+
+def index_tables(dfs: Dict[str, pd.DataFrame], version: Optional[str] = None) -> RawData:
+    """
+    Ordena las tablas hijas por user_id y adjunta el índice de particiones (si los ids lo permiten).
+    Sin `version` (datos armados en memoria) se asigna una única.
+    """
+    out = RawData(dfs)
+    out.version = version or uuid.uuid4().hex[:16]
+    for name in CHILD_TABLES:
+        if not out[name]["user_id"].is_monotonic_increasing:
+            out[name] = out[name].sort_values("user_id", kind="stable", ignore_index=True)
+    try:
+        out.partition = build_partition_index(out)
+    except TypeError:
+        out.partition = None  # user_id no ordenable (tipos mezclados): se filtra con isin
+    return out
+
+def _parse_date_range(date_range) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+    if date_range and isinstance(date_range, (list, tuple)) and len(date_range) == 2 and all(date_range):
+        return pd.to_datetime(date_range[0]).normalize(), pd.to_datetime(date_range[1]).normalize()
+    return None
+
+def _filter_indexed(dfs: RawData, institution: Optional[str], date_range=None) -> Dict[str, pd.DataFrame]:
+    """Filtro posicional con el índice: sin escanear users ni hacer isin sobre las tablas hijas."""
+    index = dfs.partition
+    pos = index.user_positions(institution, _parse_date_range(date_range))
+    everyone = pos.size == index.n_users
+    out = {"users": dfs["users"] if everyone else dfs["users"].take(pos)}
+    user_ids = np.unique(index.user_ids[pos])
+    for name in CHILD_TABLES:
+        if everyone and index.no_orphans[name]:
+            out[name] = dfs[name]  # todo el dataset y sin filas huérfanas: la tabla tal cual
+        else:
+            out[name] = dfs[name].take(index.child_rows(name, user_ids))
+    return out
+
+@timed
 def filter_by_institution_and_date(dfs: Dict[str, pd.DataFrame], institution: Optional[str], date_range=None) -> Dict[str, pd.DataFrame]:
-    """Filtra todos los DFs por institución y rango de registro en users."""
+    """
+    Filtra todos los DFs por institución y rango de registro en users.
+    Si `dfs` viene de load_raw (RawData con índice) el filtro es un corte posicional; si la
+    selección es todo el dataset se devuelven las tablas originales, sin copia (las hijas
+    sólo si no tienen filas huérfanas, cuyo user_id no está en users).
+    """
+    if isinstance(dfs, RawData) and dfs.partition is not None:
+        return _filter_indexed(dfs, institution, date_range)
+
     users = dfs["users"].copy()
     if institution:
         users = users[users["institution_name"] == institution].copy()
 
-    if date_range and isinstance(date_range, (list, tuple)) and len(date_range) == 2 and all(date_range):
-        start, end = pd.to_datetime(date_range[0]).date(), pd.to_datetime(date_range[1]).date()
-        users = users[(users["registration_date"] >= start) & (users["registration_date"] <= end)].copy()
+    dates = _parse_date_range(date_range)
+    if dates is not None:
+        start, end = dates
+        reg = users["registration_date"]
+        users = users[(reg >= start) & (reg < end + pd.Timedelta(days=1))].copy()
 
     user_ids = set(users["user_id"].unique().tolist())
 
@@ -128,3 +692,47 @@ def filter_by_institution_and_date(dfs: Dict[str, pd.DataFrame], institution: Op
         "languages": dfs["languages"][dfs["languages"]["user_id"].isin(user_ids)].copy(),
     }
     return out
+
+@dataclass
+class InstitutionView:
+    """
+    Tablas ya filtradas para (institución, rango de registro). Los transforms la aceptan en lugar
+    de `raw`, de modo que una página filtra una sola vez por rerun. Las tablas se filtran al primer
+    acceso (con el backend SQL puede no hacer falta) y son compartidas: no se deben modificar in place.
+    """
+    institution: Optional[str]
+    dates: Optional[Tuple[pd.Timestamp, pd.Timestamp]]
+    source: Dict[str, pd.DataFrame]
+    _tables: Optional[Dict[str, pd.DataFrame]] = field(default=None, repr=False)
+
+    @property
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        if self._tables is None:
+            self._tables = filter_by_institution_and_date(self.source, self.institution, self.dates)
+        return self._tables
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        return self.tables[name]
+
+_VIEWS = LRUCache(maxsize=VIEW_CACHE_SIZE)
+
+@timed
+def institution_view(dfs, institution: Optional[str] = None, date_range=None) -> InstitutionView:
+    """Vista memoizada (LRU) por (versión del dataset, institución, rango de registro)."""
+    if isinstance(dfs, InstitutionView):
+        return dfs
+    dates = _parse_date_range(date_range)
+
+    def build() -> InstitutionView:
+        return InstitutionView(institution or None, dates, dfs)
+
+    if not isinstance(dfs, RawData):
+        return build()
+    return _VIEWS.get_or_create((dfs.version, institution or None, dates), build)
+
+@register_delta_hook
+def _migrate_views(old: RawData, new: RawData, affected: set):
+    """Las vistas de instituciones no afectadas por el delta siguen valiendo para la versión nueva."""
+    for (version, institution, dates), view in _VIEWS.items():
+        if version == old.version and institution and institution not in affected:
+            _VIEWS.put((new.version, institution, dates), InstitutionView(institution, dates, new, view._tables))
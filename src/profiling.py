@@ -0,0 +1,188 @@
+"""
+Instrumentación de las rutas calientes: tiempo de pared, llamadas y filas de entrada/salida
+por función, agrupado por rerun de Streamlit.
+
+- `@timed` envuelve funciones de io_load, transforms, charts y comments (cada comentario en
+  segundo plano se mide con track_future). Sin un perfil activo en ningún hilo el costo es una
+  lectura de un entero global antes de llamar a la función.
+- `with page_profile(page):` envuelve el cuerpo de cada página: `page_profiler(page)` (sidebar)
+  abre el perfil del rerun actual en el hilo de la sesión y `render_profile(prof)` lo muestra al
+  final de la página (aunque ésta corte antes, el perfil se cierra) y lo emite como log estructurado
+  (logger "reportes.profiling", JSON por rerun; con PROFILING_LOG también a un archivo JSONL).
+"""
+from __future__ import annotations
+import functools
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROFILING_DEFAULT = os.getenv("PROFILING", "0") == "1"  # valor inicial del toggle del panel
+PROFILING_LOG = os.getenv("PROFILING_LOG")  # ruta JSONL opcional
+
+logger = logging.getLogger("reportes.profiling")
+
+_local = threading.local()
+_active = 0  # perfiles abiertos en todo el proceso; 0 => @timed no hace nada
+_active_lock = threading.Lock()
+
+class RerunProfile:
+    """Eventos (función, segundos, filas entrada, filas salida) de un rerun."""
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._t0 = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        self.events: List[Tuple[str, float, Optional[int], Optional[int]]] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+        with self._lock:
+            self.events.append((name, seconds, rows_in, rows_out))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Agregado por función, de mayor a menor tiempo total (inclusivo: incluye llamadas anidadas)."""
+        agg: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            events = list(self.events)
+        for name, seconds, rows_in, rows_out in events:
+            a = agg.setdefault(name, {"funcion": name, "llamadas": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                      "filas_entrada": 0, "filas_salida": 0})
+            a["llamadas"] += 1
+            a["total_ms"] += seconds * 1000
+            a["max_ms"] = max(a["max_ms"], seconds * 1000)
+            a["filas_entrada"] += rows_in or 0
+            a["filas_salida"] += rows_out or 0
+        return sorted(agg.values(), key=lambda a: a["total_ms"], reverse=True)
+
+    def to_record(self) -> Dict[str, Any]:
+        return {"page": self.page, "started_at": self.started_at,
+                "rerun_ms": round((self.elapsed or 0) * 1000, 2),
+                "functions": [{k: round(v, 2) if isinstance(v, float) else v for k, v in a.items()} for a in self.summary()]}
+
+def current() -> Optional[RerunProfile]:
+    return getattr(_local, "profile", None) if _active else None
+
+def begin_rerun(page: str) -> RerunProfile:
+    """Abre el perfil del rerun en el hilo actual (cierra uno previo que haya quedado abierto)."""
+    global _active
+    if getattr(_local, "profile", None) is not None:
+        end_rerun(_local.profile, log=False)
+    prof = RerunProfile(page)
+    _local.profile = prof
+    with _active_lock:
+        _active += 1
+    return prof
+
+def end_rerun(prof: RerunProfile, log: bool = True) -> RerunProfile:
+    global _active
+    if getattr(_local, "profile", None) is prof:
+        _local.profile = None
+        with _active_lock:
+            _active -= 1
+    if prof.elapsed is None:
+        prof.elapsed = time.perf_counter() - prof._t0
+        if log:
+            _log(prof.to_record())
+    return prof
+
+def _log(record: Dict[str, Any]):
+    line = json.dumps(record, ensure_ascii=False)
+    logger.info(line)
+    if PROFILING_LOG:
+        try:
+            with open(PROFILING_LOG, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            pass
+
+def _rows(obj) -> Optional[int]:
+    """
+    Filas de un DataFrame/Series/array, o de la tabla users de un dict de tablas / vista. De una
+    vista perezosa sólo se cuentan tablas ya filtradas: medir no debe forzar su carga.
+    """
+    shape = getattr(obj, "shape", None)
+    if shape:
+        return int(shape[0])
+    tables = obj if isinstance(obj, dict) else getattr(obj, "_tables", None)
+    if isinstance(tables, dict):
+        try:
+            return int(tables["users"].shape[0])
+        except Exception:
+            return None
+    return None
+
+def timed(fn: Callable = None, *, name: Optional[str] = None):
+    """Registra tiempo y filas de `fn` en el perfil del rerun del hilo actual, si lo hay."""
+    if fn is None:
+        return lambda f: timed(f, name=name)
+    label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _active:
+            return fn(*args, **kwargs)
+        prof = getattr(_local, "profile", None)
+        if prof is None:
+            return fn(*args, **kwargs)
+        t = time.perf_counter()
+        out = fn(*args, **kwargs)
+        rows_in = next((r for r in map(_rows, args) if r is not None), None)
+        prof.record(label, time.perf_counter() - t, rows_in, _rows(out))
+        return out
+
+    if hasattr(fn, "clear"):  # funciones con cache de Streamlit
+        wrapper.clear = fn.clear
+    return wrapper
+
+def track_future(name: str, future, prof: Optional[RerunProfile] = None):
+    """Registra cuánto tarda en resolverse un Future lanzado desde este rerun (p. ej. comentarios)."""
+    prof = prof or current()
+    if prof is None:
+        return future
+    t = time.perf_counter()
+    future.add_done_callback(lambda f: prof.record(name, time.perf_counter() - t))
+    return future
+
+def page_profiler(page: str) -> Optional[RerunProfile]:
+    """Toggle del panel en la sidebar; si está activo abre el perfil de este rerun."""
+    import streamlit as st
+    if not st.sidebar.toggle("⏱️ Perfilado", value=PROFILING_DEFAULT, key="profiling_on",
+                             help="Tiempo, llamadas y filas por función en este rerun"):
+        return None
+    return begin_rerun(page)
+
+@contextmanager
+def page_profile(page: str):
+    """
+    Envuelve el cuerpo de una página: abre el perfil (si el toggle está activo) y al salir lo
+    muestra. Si la página corta antes (excepción, st.stop, st.rerun) el perfil igual se cierra y
+    se emite como log, así @timed no queda encendido para todo el proceso.
+    """
+    prof = page_profiler(page)
+    done = False
+    try:
+        yield prof
+        done = True
+    finally:
+        if done:
+            render_profile(prof)
+        elif prof is not None:
+            end_rerun(prof)
+
+def render_profile(prof: Optional[RerunProfile]):
+    """Cierra el perfil del rerun, lo emite como log y lo muestra en un panel al pie de la página."""
+    if prof is None:
+        return
+    import streamlit as st
+    record = end_rerun(prof).to_record()
+    with st.expander(f"⏱️ Perfilado del rerun: {record['rerun_ms']:.0f} ms", expanded=False):
+        st.dataframe(record["functions"], hide_index=True, use_container_width=True)
+        st.caption("Tiempos inclusivos (una función incluye a las que llama); "
+                   "los comentarios se miden desde que se piden hasta que llegan.")
+        st.download_button("Descargar JSON", data=json.dumps(record, ensure_ascii=False, indent=1),
+                           file_name=f"perfil_{record['page']}.json", mime="application/json")
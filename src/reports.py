@@ -0,0 +1,33 @@
+from __future__ import annotations
+from typing import Dict, Any, Optional
+import pandas as pd
+from .io_load import institution_view
+from .transforms import compute_kpis_snapshot, dist_situacion_actual, dist_modalidad, dist_status_academic
+from .charts import donut_chart
+from .comments import submit_comment
+
+def kpi_comment_stats(kpis: Dict[str, float], dist_situacion: pd.DataFrame, dist_modalidad: pd.DataFrame) -> Dict[str, Any]:
+    """Resumen estadístico que se envía al comentario automático del módulo KPIs."""
+    return {
+        "usuarios_total": kpis["usuarios_total"],
+        "activos_90d_pct": round(kpis["activos_90d_pct"], 1),
+        "exp_mediana_anos": round(kpis["exp_mediana_anos"], 1),
+        "sal_mediana": round(kpis["sal_mediana"], 0),
+        "top_situacion": dist_situacion.head(1).to_dict("records"),
+        "top_modalidad": dist_modalidad.head(1).to_dict("records"),
+    }
+
+def kpi_report(dfs, institution: Optional[str] = None, date_range=None) -> Dict[str, Any]:
+    """Contenido del reporte de KPIs de una institución: KPIs, distribuciones, figuras y comentario."""
+    view = institution_view(dfs, institution, date_range)
+    kpis = compute_kpis_snapshot(view)
+    dist1 = dist_situacion_actual(view)
+    dist2 = dist_modalidad(view)
+    dist3 = dist_status_academic(view)
+    comment = submit_comment(module="KPIs", stats_dict=kpi_comment_stats(kpis, dist1, dist2))  # en paralelo con las figuras
+    figs = {
+        "Situación actual": donut_chart(dist1, "Situación actual"),
+        "Modalidad": donut_chart(dist2, "Preferencia de modalidad"),
+        "Estado académico": donut_chart(dist3, "Estado académico"),
+    }
+    return dict(institution=view.institution or institution, kpis=kpis, figs=figs, comments=comment.result())
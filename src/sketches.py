@@ -0,0 +1,168 @@
+"""
+Sketches de cuantiles mergeables (estilo DDSketch) para medianas y percentiles de KPIs.
+
+Cada valor cae en el bucket ceil(log_gamma(|x|)), con gamma = (1 + a) / (1 - a): cualquier
+cuantil estimado queda a un error relativo <= a (QUANTILE_ACCURACY) del exacto, y dos sketches
+se combinan sumando sus conteos. Un SketchGrid guarda un sketch por celda (p. ej. institución ×
+mes) como filas dispersas, de modo que cualquier unión de celdas se responde sumando filas, sin
+volver a recorrer las tablas. Por defecto (QUANTILE_MODE=exact) los cuantiles se calculan sobre
+los valores de esas celdas, que el grid también guarda ordenados por celda; QUANTILE_MODE=sketch
+usa los sketches para el total de todas las instituciones.
+"""
+from __future__ import annotations
+import os
+from typing import Iterable, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+QUANTILE_ACCURACY = float(os.getenv("QUANTILE_ACCURACY", "0.01"))  # error relativo máximo
+QUANTILE_MODE = os.getenv("QUANTILE_MODE", "exact").lower()         # "exact" | "sketch"
+_ZERO = 1e-12  # |x| por debajo cuenta como cero
+
+def _gamma(accuracy: float) -> float:
+    if not 0 < accuracy < 1:
+        raise ValueError(f"QUANTILE_ACCURACY debe estar en (0, 1): {accuracy}")
+    return (1 + accuracy) / (1 - accuracy)
+
+def _keys(abs_values: np.ndarray, gamma: float) -> np.ndarray:
+    return np.ceil(np.log(abs_values) / np.log(gamma)).astype(np.int64)
+
+class QuantileSketch:
+    """Conteos por bucket de valores positivos y negativos, ceros aparte, y min/max exactos."""
+    def __init__(self, accuracy: float = QUANTILE_ACCURACY, pos_offset: int = 0, pos=None,
+                 neg_offset: int = 0, neg=None, zeros: int = 0, vmin: float = np.inf, vmax: float = -np.inf):
+        self.accuracy = accuracy
+        self.gamma = _gamma(accuracy)
+        self.pos_offset, self.pos = pos_offset, np.zeros(0, dtype=np.int64) if pos is None else np.asarray(pos, dtype=np.int64)
+        self.neg_offset, self.neg = neg_offset, np.zeros(0, dtype=np.int64) if neg is None else np.asarray(neg, dtype=np.int64)
+        self.zeros = int(zeros)
+        self.min, self.max = float(vmin), float(vmax)
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], accuracy: float = QUANTILE_ACCURACY) -> "QuantileSketch":
+        v = np.asarray(values, dtype=float)
+        v = v[np.isfinite(v)]
+        sk = cls(accuracy)
+        if not v.size:
+            return sk
+        gamma = sk.gamma
+        for sign, attr in ((1, "pos"), (-1, "neg")):
+            part = v[sign * v > _ZERO] * sign
+            if part.size:
+                keys = _keys(part, gamma)
+                offset = int(keys.min())
+                setattr(sk, attr, np.bincount(keys - offset))
+                setattr(sk, f"{attr}_offset", offset)
+        sk.zeros = int((np.abs(v) <= _ZERO).sum())
+        sk.min, sk.max = float(v.min()), float(v.max())
+        return sk
+
+    @property
+    def count(self) -> int:
+        return int(self.pos.sum() + self.neg.sum() + self.zeros)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Sketch de la unión (exacto: sólo suma conteos); ambos deben tener la misma precisión."""
+        if other.accuracy != self.accuracy:
+            raise ValueError("no se pueden combinar sketches con distinta precisión")
+
+        def add(o1, a, o2, b):
+            if not a.size:
+                return o2, b.copy()
+            if not b.size:
+                return o1, a.copy()
+            lo = min(o1, o2)
+            out = np.zeros(max(o1 + a.size, o2 + b.size) - lo, dtype=np.int64)
+            out[o1 - lo:o1 - lo + a.size] += a
+            out[o2 - lo:o2 - lo + b.size] += b
+            return lo, out
+
+        pos_offset, pos = add(self.pos_offset, self.pos, other.pos_offset, other.pos)
+        neg_offset, neg = add(self.neg_offset, self.neg, other.neg_offset, other.neg)
+        return QuantileSketch(self.accuracy, pos_offset, pos, neg_offset, neg, self.zeros + other.zeros,
+                              min(self.min, other.min), max(self.max, other.max))
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _value_at(self, rank: int) -> float:
+        """Valor estimado del elemento de orden `rank` (0 = mínimo)."""
+        n_neg = int(self.neg.sum())
+        if rank < n_neg:
+            i = int(np.searchsorted(np.cumsum(self.neg[::-1]), rank, side="right"))
+            return -self._value(self.neg_offset + self.neg.size - 1 - i)
+        rank -= n_neg
+        if rank < self.zeros:
+            return 0.0
+        rank -= self.zeros
+        i = int(np.searchsorted(np.cumsum(self.pos), rank, side="right"))
+        return self._value(self.pos_offset + i)
+
+    def quantile(self, q: float) -> float:
+        """Cuantil con interpolación lineal entre órdenes (como pandas/numpy); NaN si está vacío."""
+        n = self.count
+        if n == 0:
+            return float("nan")
+        r = q * (n - 1)
+        lo, hi = int(np.floor(r)), int(np.ceil(r))
+        v = self._value_at(lo)
+        if hi != lo:
+            v += (self._value_at(hi) - v) * (r - lo)
+        return float(min(max(v, self.min), self.max))
+
+class SketchGrid:
+    """
+    Un sketch por celda (0..n_cells-1) guardado como matriz dispersa celdas × buckets, más los
+    valores originales ordenados por celda (con su día) para bordes parciales y modo exacto.
+    """
+    def __init__(self, cells: np.ndarray, values: np.ndarray, days: np.ndarray, n_cells: int,
+                 accuracy: float = QUANTILE_ACCURACY):
+        values = np.asarray(values, dtype=float)
+        ok = np.isfinite(values)
+        cells, values, days = np.asarray(cells)[ok], values[ok], np.asarray(days)[ok]
+        order = np.argsort(cells, kind="stable")
+        self.cells, self.values, self.days = cells[order], values[order], days[order]
+        self.ptr = np.searchsorted(self.cells, np.arange(n_cells + 1))
+        self.n_cells = n_cells
+        self.accuracy = accuracy
+        gamma = _gamma(accuracy)
+
+        self.zeros = np.bincount(self.cells[np.abs(self.values) <= _ZERO], minlength=n_cells)
+        self.vmin = np.full(n_cells, np.inf)
+        self.vmax = np.full(n_cells, -np.inf)
+        np.minimum.at(self.vmin, self.cells, self.values)
+        np.maximum.at(self.vmax, self.cells, self.values)
+        self.offsets, self.counts = {}, {}
+        for sign, attr in ((1, "pos"), (-1, "neg")):
+            mask = sign * self.values > _ZERO
+            keys = _keys(self.values[mask] * sign, gamma) if mask.any() else np.zeros(0, dtype=np.int64)
+            offset = int(keys.min()) if keys.size else 0
+            width = int(keys.max()) - offset + 1 if keys.size else 0
+            m = sp.csr_matrix((np.ones(keys.size, dtype=np.int64), (self.cells[mask], keys - offset)),
+                              shape=(n_cells, width))
+            m.sum_duplicates()
+            self.offsets[attr], self.counts[attr] = offset, m
+
+    def sketch(self, cells: np.ndarray) -> QuantileSketch:
+        """Sketch de la unión de `cells` (suma de filas)."""
+        cells = np.asarray(cells, dtype=np.int64)
+        if not cells.size:
+            return QuantileSketch(self.accuracy)
+        row = lambda attr: np.asarray(self.counts[attr][cells].sum(axis=0)).ravel()
+        return QuantileSketch(self.accuracy, self.offsets["pos"], row("pos"), self.offsets["neg"], row("neg"),
+                              int(self.zeros[cells].sum()), self.vmin[cells].min(), self.vmax[cells].max())
+
+    def cell_values(self, cells: np.ndarray, days: Optional[Tuple[np.datetime64, np.datetime64]] = None) -> np.ndarray:
+        """Valores exactos de `cells`, opcionalmente sólo los de días en [inicio, fin]."""
+        cells = np.asarray(cells, dtype=np.int64)
+        if not cells.size:
+            return np.zeros(0)
+        lo, hi = self.ptr[cells], self.ptr[cells + 1]
+        idx = np.concatenate([np.arange(a, b, dtype=np.int64) for a, b in zip(lo, hi)])
+        if days is not None:
+            d = self.days[idx]
+            idx = idx[(d >= days[0]) & (d <= days[1])]
+        return self.values[idx]
@@ -0,0 +1,182 @@
+"""
+Backend SQL embebido (DuckDB, en proceso) para los transforms: TRANSFORMS_BACKEND=duckdb.
+
+Las tablas de load_raw se registran como Arrow (una conversión por versión del dataset) y cada transform
+corre como una consulta con el filtro de institución/rango empujado al SQL, en lugar de
+materializar la vista filtrada y los merges intermedios en pandas. Sólo vuelve el resultado
+agregado; el redondeo y el orden final se aplican en pandas para dar los mismos frames que la
+ruta pandas (salvo el índice, que aquí es 0..n-1). Paridad: python -m bench.parity.
+"""
+from __future__ import annotations
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import duckdb
+from .io_load import InstitutionView, RawData, TABLE_FILES, _parse_date_range
+
+_local = threading.local()  # una conexión por hilo (las tablas registradas no se comparten entre conexiones)
+_ARROW: Dict[str, Any] = {}  # versión -> tablas Arrow compartidas por todos los hilos
+_ARROW_LOCK = threading.Lock()
+
+def _arrow_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame -> Arrow con una columna _row (posición de la fila): ordenar por ella da el mismo
+    orden que la ruta pandas, que conserva el orden de las tablas."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.append_column("_row", pa.array(np.arange(len(df), dtype=np.int64)))
+
+def _arrow_tables(raw: RawData) -> Dict[str, pa.Table]:
+    """Tablas de la versión como Arrow: DuckDB las escanea ~2x más rápido que los DataFrames."""
+    with _ARROW_LOCK:
+        if _ARROW.get("version") != raw.version:
+            _ARROW.clear()
+            _ARROW.update(version=raw.version, tables={name: _arrow_table(raw[name]) for name in TABLE_FILES})
+        return _ARROW["tables"]
+
+def _connection(raw: RawData) -> duckdb.DuckDBPyConnection:
+    con = getattr(_local, "con", None)
+    if con is None or _local.version != raw.version:
+        if con is not None:
+            con.close()
+        con = duckdb.connect(":memory:")
+        for name, table in _arrow_tables(raw).items():
+            con.register(name, table)
+        _local.con, _local.version = con, raw.version
+    return con
+
+def scope(dfs, institution: Optional[str] = None, date_range=None) -> Optional[Tuple[RawData, Optional[str], Any]]:
+    """(dataset, institución, fechas) si la consulta se puede empujar a SQL; None si no (dict suelto)."""
+    if isinstance(dfs, InstitutionView):
+        dfs, institution, dates = dfs.source, dfs.institution, dfs.dates
+    else:
+        dates = _parse_date_range(date_range)
+    if not isinstance(dfs, RawData):
+        return None
+    return dfs, institution or None, dates
+
+# Usuarios seleccionados (institución + rango de registro, fin inclusive)
+_SEL = """
+sel AS (
+    SELECT * FROM users
+    WHERE ($inst IS NULL OR institution_name = $inst)
+      AND ($start IS NULL OR (registration_date >= $start AND registration_date < $end))
+)"""
+
+_EXP = """
+exp AS (
+    SELECT user_id, round(sum(duration_months) / 12.0, 2) AS exp_years
+    FROM workexperiences WHERE user_id IN (SELECT user_id FROM sel) GROUP BY user_id
+)"""
+
+_ONB = """
+onb AS (
+    SELECT user_id, situacion_actual, _row AS onb_row,
+           (coalesce(salario_expect_min, 0)::DOUBLE + coalesce(salario_expect_max, 0)::DOUBLE) / 2.0 AS salario_mid
+    FROM onboardings WHERE user_id IN (SELECT user_id FROM sel)
+)"""
+
+def _query(sc, sql: str, **params) -> pd.DataFrame:
+    raw, institution, dates = sc
+    start, end = (None, None) if dates is None else (dates[0].to_pydatetime(), (dates[1] + pd.Timedelta(days=1)).to_pydatetime())
+    params.update(inst=institution, start=start, end=end)
+    return _connection(raw).execute(sql, params).df()
+
+def skills_coverage(sc, skill_type="hard") -> pd.DataFrame:
+    g = _query(sc, f"""
+        WITH {_SEL}
+        SELECT skill_name::VARCHAR AS skill_name, count(DISTINCT user_id) AS users, avg(level) AS avg_level,
+               (SELECT count(DISTINCT user_id) FROM sel) AS total
+        FROM skills
+        WHERE user_id IN (SELECT user_id FROM sel) AND skill_type = $skill_type AND skill_name IS NOT NULL
+        GROUP BY 1 ORDER BY 1""", skill_type=skill_type)
+    if g.empty:
+        return pd.DataFrame(columns=["skill_name","users","coverage_pct","avg_level"])
+    g["coverage_pct"] = (g["users"] * 100.0 / max(1, int(g["total"].iloc[0]))).round(2)
+    g["avg_level"] = g["avg_level"].round(2)
+    g = g[["skill_name","users","avg_level","coverage_pct"]]
+    return g.sort_values(["coverage_pct","users"], ascending=[False,False], ignore_index=True)
+
+def coverage(sc, skill_type="hard") -> pd.DataFrame:
+    """Equivalente a transforms._coverage_from sobre la selección."""
+    g = skills_coverage(sc, skill_type)
+    if g.empty:
+        return pd.DataFrame(columns=["skill_name","coverage_pct"])
+    return g.sort_values("skill_name", ignore_index=True)[["skill_name","coverage_pct"]]
+
+def skills_heatmap(sc, skill_type="hard") -> pd.DataFrame:
+    heat = _query(sc, f"""
+        WITH {_SEL}
+        SELECT skill_name::VARCHAR AS skill_name, level, count(DISTINCT user_id) AS count
+        FROM skills
+        WHERE user_id IN (SELECT user_id FROM sel) AND skill_type = $skill_type
+          AND skill_name IS NOT NULL AND level IS NOT NULL
+        GROUP BY 1, 2 ORDER BY 1, 2""", skill_type=skill_type)
+    if heat.empty:
+        return pd.DataFrame(columns=["skill_name","level","count"])
+    return heat
+
+def salaries_experience_df(sc) -> pd.DataFrame:
+    out = _query(sc, f"""
+        WITH {_SEL}, {_EXP}, {_ONB}
+        SELECT sel.user_id, coalesce(exp.exp_years, 0.0) AS exp_years, coalesce(onb.salario_mid, 0.0) AS salario_mid,
+               onb.situacion_actual, (SELECT count(*) FROM onb) AS n_onb
+        FROM sel LEFT JOIN exp USING (user_id) LEFT JOIN onb USING (user_id)
+        ORDER BY sel._row, onb.onb_row""")
+    if out.empty or out["n_onb"].iloc[0] == 0:
+        return pd.DataFrame(columns=["user_id","exp_years","salario_mid","situacion_actual"])
+    return out.drop(columns="n_onb")
+
+def languages_distribution(sc) -> pd.DataFrame:
+    s = _query(sc, f"""
+        WITH {_SEL}
+        SELECT lang_code::VARCHAR AS label, count(*) AS count
+        FROM languages WHERE user_id IN (SELECT user_id FROM sel) AND lang_code IS NOT NULL
+        GROUP BY 1 ORDER BY 2 DESC, 1""")
+    if s.empty:
+        return pd.DataFrame(columns=["label","count","pct"])
+    s["pct"] = s["count"] * 100.0 / max(1, s["count"].sum())
+    return s
+
+def languages_level_summary(sc, level_map: Dict[str, int]) -> pd.DataFrame:
+    cases = " ".join(f"WHEN '{k}' THEN {int(v)}" for k, v in level_map.items())
+    g = _query(sc, f"""
+        WITH {_SEL}
+        SELECT lang_code::VARCHAR AS lang_code, avg(CASE level::VARCHAR {cases} ELSE 0 END)::DOUBLE AS level_numeric_mean
+        FROM languages WHERE user_id IN (SELECT user_id FROM sel) AND lang_code IS NOT NULL
+        GROUP BY 1 ORDER BY 2 DESC, 1""")
+    if g.empty:
+        return pd.DataFrame(columns=["lang_code","level_numeric_mean"])
+    return g
+
+def registrations_by_month(sc) -> pd.DataFrame:
+    s = _query(sc, f"""
+        WITH {_SEL}
+        SELECT strftime(registration_date, '%Y-%m') AS month, count(user_id) AS usuarios
+        FROM sel WHERE registration_date IS NOT NULL GROUP BY 1 ORDER BY 1""")
+    if s.empty:
+        return pd.DataFrame(columns=["month","usuarios"])
+    return s
+
+def ready_to_hire_table(sc, min_exp_years: float, salary_mid_cap: float, lang_required: Optional[List[str]] = None,
+                        columns: Optional[List[str]] = None) -> pd.DataFrame:
+    langs = sorted(set(lang_required or []))
+    lang_filter = """
+          AND user_id IN (
+              SELECT user_id FROM languages WHERE lang_code::VARCHAR IN (SELECT unnest($langs))
+              GROUP BY user_id HAVING count(DISTINCT lang_code) = $n_langs
+          )""" if langs else ""
+    params = dict(min_exp=float(min_exp_years), cap=float(salary_mid_cap))
+    if langs:
+        params.update(langs=langs, n_langs=len(langs))
+    out = _query(sc, f"""
+        WITH {_SEL}, {_EXP}, {_ONB},
+        base AS (
+            SELECT sel.*, onb.onb_row, coalesce(exp.exp_years, 0.0) AS exp_years, coalesce(onb.salario_mid, 0.0) AS salario_mid,
+                   onb.situacion_actual
+            FROM sel LEFT JOIN exp USING (user_id) LEFT JOIN onb USING (user_id)
+        )
+        SELECT * EXCLUDE (_row, onb_row) FROM base
+        WHERE exp_years >= $min_exp AND salario_mid > 0 AND salario_mid <= $cap {lang_filter}
+        ORDER BY exp_years DESC, salario_mid ASC, _row, onb_row""", **params)
+    return out[[c for c in (columns or out.columns) if c in out.columns]]
@@ -1,31 +1,291 @@
 from __future__ import annotations
-from typing import Dict, Optional, List
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Tuple
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from datetime import date, timedelta
-from .io_load import filter_by_institution_and_date
+from .io_load import (
+    filter_by_institution_and_date, institution_view, InstitutionView, RawData, _parse_date_range,
+    register_delta_hook, CHILD_TABLES
+)
+from .memo import LRUCache
+from .profiling import timed
+from .sketches import QUANTILE_ACCURACY, QUANTILE_MODE, QuantileSketch, SketchGrid
 
 MCER_TO_NUM = {"A1":1, "A2":2, "B1":3, "B2":4, "C1":5, "C2":6}
 
+# "pandas" (por defecto) o "duckdb": los transforms con consulta SQL equivalente se ejecutan en
+# DuckDB sobre las tablas de load_raw, sin materializar la vista filtrada ni los merges
+TRANSFORMS_BACKEND = os.getenv("TRANSFORMS_BACKEND", "pandas").lower()
+
+def _sql_scope(dfs, institution: Optional[str] = None, date_range=None):
+    """(sql_backend, alcance) si el backend SQL está activo y los datos vienen de load_raw; si no (None, None)."""
+    if TRANSFORMS_BACKEND != "duckdb":
+        return None, None
+    try:
+        from . import sql_backend  # requiere duckdb
+    except ImportError:
+        return None, None
+    sc = sql_backend.scope(dfs, institution, date_range)
+    return (sql_backend, sc) if sc is not None else (None, None)
+
+def _scope(dfs, institution: Optional[str] = None, date_range=None):
+    """(fuente, institución, fechas) de una consulta, venga de raw o de una InstitutionView."""
+    if isinstance(dfs, InstitutionView):
+        return dfs.source, dfs.institution, dfs.dates
+    return dfs, institution or None, _parse_date_range(date_range)
+
 def _now_date() -> date:
     return pd.Timestamp.today().date()
 
+def _activity_cutoff(days: int = 90) -> pd.Timestamp:
+    return pd.Timestamp(_now_date() - timedelta(days=days))
+
 def _experience_years(workexp: pd.DataFrame) -> pd.DataFrame:
     """Suma duración en meses por usuario y convierte a años (float)."""
     if workexp.empty:
         return pd.DataFrame({"user_id": [], "exp_years": []})
-    agg = workexp.groupby("user_id", as_index=False)["duration_months"].sum()
+    agg = workexp.groupby("user_id", as_index=False, observed=True)["duration_months"].sum()
     agg["exp_years"] = (agg["duration_months"] / 12.0).round(2)
     return agg[["user_id","exp_years"]]
 
+def _value_counts(s: pd.Series, dropna: bool = True) -> pd.DataFrame:
+    """value_counts como (label, count), sin las categorías no observadas de las columnas category."""
+    vc = s.value_counts(dropna=dropna)
+    return vc[vc > 0].rename_axis("label").reset_index(name="count")
+
 def _salary_mid(onb: pd.DataFrame) -> pd.Series:
     if onb.empty:
         return pd.Series([], dtype=float)
-    mid = (onb["salario_expect_min"].fillna(0) + onb["salario_expect_max"].fillna(0)) / 2.0
+    # a float antes de sumar: las columnas pueden venir reducidas a int16/int32
+    mid = (onb["salario_expect_min"].astype(float).fillna(0) + onb["salario_expect_max"].astype(float).fillna(0)) / 2.0
     return mid
 
-def compute_kpis_snapshot(dfs: Dict[str, pd.DataFrame], institution: Optional[str], date_range=None) -> Dict[str, float]:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
+# Distribuciones categóricas del cubo: nombre -> (tabla, columna)
+CUBE_DISTS = {
+    "situacion_actual": ("onboardings", "situacion_actual"),
+    "modalidad": ("users", "modality_preference"),
+    "status_academic": ("users", "status_academic"),
+}
+
+@dataclass
+class KpiCube:
+    """KPIs y distribuciones de todas las instituciones, calculados en una sola pasada agrupada."""
+    kpis: pd.DataFrame              # index institution_name
+    dists: Dict[str, pd.DataFrame]  # nombre -> institution_name, label, count, pct
+
+    def snapshot(self, institution: str) -> Dict[str, float]:
+        if institution not in self.kpis.index:
+            return dict(usuarios_total=0, activos_90d_pct=0.0, exp_mediana_anos=0.0, sal_mediana=0.0)
+        row = self.kpis.loc[institution]
+        return dict(
+            usuarios_total=int(row["usuarios_total"]),
+            activos_90d_pct=float(row["activos_90d_pct"]),
+            exp_mediana_anos=float(row["exp_mediana_anos"]),
+            sal_mediana=float(row["sal_mediana"]),
+        )
+
+    def dist(self, name: str, institution: str) -> pd.DataFrame:
+        d = self.dists[name]
+        return d[d["institution_name"] == institution][["label","count","pct"]].reset_index(drop=True)
+
+_CUBES = LRUCache(maxsize=8)
+
+@timed
+def build_kpi_cube(dfs, date_range=None) -> KpiCube:
+    """Agrega usuarios, activos 90d, medianas y distribuciones por institución en un solo groupby."""
+    f = filter_by_institution_and_date(dfs, None, date_range)
+    users = f["users"]
+    inst_of = users[["user_id","institution_name"]].drop_duplicates()
+
+    by_inst = users.groupby("institution_name", observed=True)
+    activos = (users["registration_date"] >= _activity_cutoff()).groupby(users["institution_name"], observed=True).sum()
+    kpis = pd.DataFrame({"usuarios_total": by_inst.size()})
+    kpis["activos_90d_pct"] = activos.reindex(kpis.index).fillna(0) * 100.0 / kpis["usuarios_total"]
+
+    exp = _experience_years(f["workexperiences"]).merge(inst_of, on="user_id")
+    kpis["exp_mediana_anos"] = exp.groupby("institution_name", observed=True)["exp_years"].median()
+    onb = f["onboardings"].merge(inst_of, on="user_id")
+    kpis["sal_mediana"] = _salary_mid(onb).groupby(onb["institution_name"], observed=True).median()
+    kpis = kpis.fillna({"exp_mediana_anos": 0.0, "sal_mediana": 0.0})
+
+    dists = {}
+    for name, (table, col) in CUBE_DISTS.items():
+        src = users if table == "users" else f[table].merge(inst_of, on="user_id")
+        # sort=False conserva el orden de aparición: los empates quedan por orden de aparición
+        d = src.groupby(["institution_name", col], sort=False, dropna=False, observed=True).size().reset_index(name="count")
+        d = d.rename(columns={col: "label"}).sort_values(["institution_name","count"], ascending=[True,False], kind="stable")
+        d["pct"] = d["count"] * 100 / d.groupby("institution_name", observed=True)["count"].transform("sum")
+        dists[name] = d
+    return KpiCube(kpis=kpis, dists=dists)
+
+def _cube_key(dfs, date_range=None):
+    if isinstance(dfs, InstitutionView):
+        dfs, dates = dfs.source, dfs.dates
+    else:
+        dates = _parse_date_range(date_range)
+    if not isinstance(dfs, RawData):
+        return None
+    return (dfs.version, dates, _now_date())
+
+@timed
+def kpi_cube(dfs, date_range=None) -> KpiCube:
+    """Cubo memoizado por (versión del dataset, rango de registro, día)."""
+    key = _cube_key(dfs, date_range)
+    if key is None:
+        return build_kpi_cube(dfs, date_range)
+    return _CUBES.get_or_create(key, lambda: build_kpi_cube(dfs, date_range))
+
+def _cached_cube(dfs, institution: Optional[str], date_range=None):
+    """(cubo, institución) si ya hay un cubo materializado que responda la consulta; no lo construye."""
+    if isinstance(dfs, InstitutionView):
+        institution = dfs.institution
+    key = _cube_key(dfs, date_range)
+    if not institution or key is None:
+        return None, institution
+    return _CUBES.get(key), institution
+
+@dataclass
+class KpiQuantiles:
+    """
+    Un SketchGrid por métrica (exp_years por usuario con experiencia, salario_mid por onboarding)
+    con una celda por (institución, mes de registro). La última institución reúne usuarios sin
+    institución y el último mes, los usuarios sin fecha de registro; las filas sin usuario en users
+    se descartan (como en el cubo). Los cuantiles son exactos sobre los valores de las celdas
+    elegidas (así coinciden con el cubo); con QUANTILE_MODE=sketch el total combina los sketches
+    de todas las instituciones. Los meses que el rango cubre sólo en parte se completan con los
+    valores exactos de esos días.
+    """
+    institutions: pd.Index
+    first_month: np.datetime64   # datetime64[M]
+    n_months: int                # columnas de meses (más una para "sin fecha")
+    grids: Dict[str, SketchGrid]
+
+    def _cells(self, institution: Optional[str], dates):
+        """(celdas completas, celdas de borde, (día inicio, día fin) o None)."""
+        width = self.n_months + 1
+        if institution:
+            i = self.institutions.get_indexer([institution])[0]
+            rows = np.array([i] if i >= 0 else [], dtype=np.int64)
+        else:
+            rows = np.arange(len(self.institutions) + 1, dtype=np.int64)
+        if dates is None:
+            return (rows[:, None] * width + np.arange(width)).ravel(), np.zeros(0, dtype=np.int64), None
+        d0, d1 = np.datetime64(dates[0].date(), "D"), np.datetime64(dates[1].date(), "D")
+        m0 = max(int((d0.astype("datetime64[M]") - self.first_month).astype(np.int64)), 0)
+        m1 = min(int((d1.astype("datetime64[M]") - self.first_month).astype(np.int64)), self.n_months - 1)
+        months = np.arange(m0, m1 + 1, dtype=np.int64)
+        starts = (self.first_month + months).astype("datetime64[D]")
+        ends = (self.first_month + months + 1).astype("datetime64[D]") - 1
+        full = (starts >= d0) & (ends <= d1)
+        cells = lambda ms: (rows[:, None] * width + ms).ravel()
+        return cells(months[full]), cells(months[~full]), (d0, d1)
+
+    def quantiles(self, institution: Optional[str], dates, qs, exact: Optional[bool] = None) -> Dict[str, tuple]:
+        """métrica -> (n, [cuantiles]); NaN si la selección no tiene valores. Sketch sólo para el total con QUANTILE_MODE=sketch."""
+        if exact is None:
+            exact = QUANTILE_MODE == "exact" or bool(institution)
+        full, edge, days = self._cells(institution, dates)
+        out = {}
+        for metric, grid in self.grids.items():
+            edge_values = grid.cell_values(edge, days)
+            if exact:
+                values = np.concatenate([grid.cell_values(full), edge_values])
+                out[metric] = (values.size, [float(np.quantile(values, q)) if values.size else float("nan") for q in qs])
+            else:
+                sk = grid.sketch(full).merge(QuantileSketch.from_values(edge_values, grid.accuracy))
+                out[metric] = (sk.count, [sk.quantile(q) for q in qs])
+        return out
+
+def build_kpi_quantiles(dfs: RawData) -> Optional[KpiQuantiles]:
+    """Sketches de las métricas de KPIs por institución × mes; None si no hay índice de particiones."""
+    index = dfs.partition
+    if index is None or not pd.Index(index.user_ids).is_unique:
+        return None
+    users = dfs["users"]
+    institutions = pd.Index(sorted(users["institution_name"].dropna().astype(str).unique()))
+    inst_code = institutions.get_indexer(users["institution_name"].to_numpy(dtype=object))
+    inst_code = np.where(inst_code < 0, len(institutions), inst_code)
+    reg = index.registration
+    valid = ~np.isnat(reg)
+    month = reg.astype("datetime64[M]")
+    first = month[valid].min() if valid.any() else np.datetime64(_now_date(), "M")
+    n_months = int((month[valid].max() - first).astype(np.int64)) + 1 if valid.any() else 0
+    width = n_months + 1
+    month_code = np.where(valid, (month - first).astype(np.int64), n_months)
+    user_cell = inst_code * width + month_code
+    user_day = reg.astype("datetime64[D]")
+    n_cells = (len(institutions) + 1) * width
+    lookup = pd.Index(index.user_ids)
+
+    def grid(user_ids, values) -> SketchGrid:
+        pos = lookup.get_indexer(np.asarray(user_ids))
+        known = pos >= 0  # filas sin usuario en users: fuera
+        pos = pos[known]
+        return SketchGrid(user_cell[pos], np.asarray(values, dtype=float)[known], user_day[pos], n_cells, QUANTILE_ACCURACY)
+
+    exp = _experience_years(dfs["workexperiences"])
+    onb = dfs["onboardings"]
+    grids = {
+        "exp_years": grid(exp["user_id"].to_numpy(), exp["exp_years"].to_numpy()),
+        "salario_mid": grid(onb["user_id"].to_numpy(), _salary_mid(onb).to_numpy()),
+    }
+    return KpiQuantiles(institutions, first, n_months, grids)
+
+_QUANTILES = LRUCache(maxsize=4)
+
+def kpi_quantiles(dfs) -> Optional[KpiQuantiles]:
+    """KpiQuantiles memoizado por versión del dataset (None si `dfs` no viene de load_raw)."""
+    if not isinstance(dfs, RawData):
+        return None
+    return _QUANTILES.get_or_create(dfs.version, lambda: build_kpi_quantiles(dfs))
+
+@timed
+def kpi_percentiles(dfs, institution: Optional[str] = None, date_range=None, qs=(0.25, 0.5, 0.75, 0.9)) -> pd.DataFrame:
+    """
+    Percentiles de exp_years y salario_mid (una fila por métrica, columnas p25.. y n) con la misma
+    población que las medianas de compute_kpis_snapshot. Exactos; con QUANTILE_MODE=sketch el
+    total sale de los sketches (error relativo <= QUANTILE_ACCURACY).
+    """
+    cols = [f"p{round(q * 100):g}" for q in qs]
+    source, scope_inst, dates = _scope(dfs, institution, date_range)
+    kq = kpi_quantiles(source)
+    if kq is not None:
+        res = kq.quantiles(scope_inst, dates, qs)
+    else:
+        f = institution_view(dfs, institution, date_range)
+        values = {"exp_years": _experience_years(f["workexperiences"])["exp_years"],
+                  "salario_mid": _salary_mid(f["onboardings"])}
+        res = {m: (int(v.notna().sum()), [float(v.quantile(q)) if v.notna().any() else float("nan") for q in qs])
+               for m, v in values.items()}
+    out = pd.DataFrame({m: dict(zip(cols, vals), n=n) for m, (n, vals) in res.items()}).T
+    out["n"] = out["n"].astype(int)
+    return out[cols + ["n"]]
+
+@timed
+def compute_kpis_snapshot(dfs: Dict[str, pd.DataFrame], institution: Optional[str] = None, date_range=None) -> Dict[str, float]:
+    cube, inst = _cached_cube(dfs, institution, date_range)
+    if cube is not None:
+        return cube.snapshot(inst)
+    source, scope_inst, dates = _scope(dfs, institution, date_range)
+    kq = kpi_quantiles(source)
+    if kq is not None:
+        # conteos por posiciones del índice y medianas desde KpiQuantiles (exactas, como el cubo):
+        # sin materializar la vista
+        pos = source.partition.user_positions(scope_inst, dates)
+        if pos.size == 0:
+            return dict(usuarios_total=0, activos_90d_pct=0.0, exp_mediana_anos=0.0, sal_mediana=0.0)
+        activos_90d = int((source.partition.registration[pos] >= _activity_cutoff().to_datetime64()).sum())
+        med = kq.quantiles(scope_inst, dates, [0.5])
+        return dict(
+            usuarios_total=int(pos.size),
+            activos_90d_pct=activos_90d * 100.0 / pos.size,
+            exp_mediana_anos=float(np.nan_to_num(med["exp_years"][1][0])),
+            sal_mediana=float(np.nan_to_num(med["salario_mid"][1][0])),
+        )
+    f = institution_view(dfs, institution, date_range)
     users = f["users"]; onb = f["onboardings"]; work = f["workexperiences"]
 
     usuarios_total = int(users.shape[0])
@@ -33,8 +293,7 @@ def compute_kpis_snapshot(dfs: Dict[str, pd.DataFrame], institution: Optional[st
         return dict(usuarios_total=0, activos_90d_pct=0.0, exp_mediana_anos=0.0, sal_mediana=0.0)
 
     # activos 90d ~ registro reciente (si no hay 'last_activity_date')
-    cutoff = _now_date() - timedelta(days=90)
-    activos_90d = users["registration_date"].fillna(date(1970,1,1)).apply(lambda d: d >= cutoff).sum()
+    activos_90d = int((users["registration_date"] >= _activity_cutoff()).sum())  # NaT => no activo
     activos_90d_pct = (activos_90d / usuarios_total) * 100.0
 
     exp = _experience_years(work)
@@ -52,35 +311,51 @@ def compute_kpis_snapshot(dfs: Dict[str, pd.DataFrame], institution: Optional[st
         sal_mediana=sal_mediana
     )
 
-def dist_situacion_actual(dfs, institution: Optional[str], date_range=None) -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
-    onb = f["onboardings"].copy()
+@timed
+def dist_situacion_actual(dfs, institution: Optional[str] = None, date_range=None) -> pd.DataFrame:
+    cube, inst = _cached_cube(dfs, institution, date_range)
+    if cube is not None:
+        return cube.dist("situacion_actual", inst)
+    f = institution_view(dfs, institution, date_range)
+    onb = f["onboardings"]
     if onb.empty: return pd.DataFrame(columns=["label","count","pct"])
-    s = onb["situacion_actual"].value_counts(dropna=False).rename_axis("label").reset_index(name="count")
+    s = _value_counts(onb["situacion_actual"], dropna=False)
     total = s["count"].sum()
     s["pct"] = s["count"]*100/total
     return s
 
-def dist_modalidad(dfs, institution: Optional[str], date_range=None) -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
-    users = f["users"].copy()
+@timed
+def dist_modalidad(dfs, institution: Optional[str] = None, date_range=None) -> pd.DataFrame:
+    cube, inst = _cached_cube(dfs, institution, date_range)
+    if cube is not None:
+        return cube.dist("modalidad", inst)
+    f = institution_view(dfs, institution, date_range)
+    users = f["users"]
     if users.empty: return pd.DataFrame(columns=["label","count","pct"])
-    s = users["modality_preference"].value_counts(dropna=False).rename_axis("label").reset_index(name="count")
+    s = _value_counts(users["modality_preference"], dropna=False)
     total = s["count"].sum()
     s["pct"] = s["count"]*100/total
     return s
 
-def dist_status_academic(dfs, institution: Optional[str], date_range=None) -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
-    users = f["users"].copy()
+@timed
+def dist_status_academic(dfs, institution: Optional[str] = None, date_range=None) -> pd.DataFrame:
+    cube, inst = _cached_cube(dfs, institution, date_range)
+    if cube is not None:
+        return cube.dist("status_academic", inst)
+    f = institution_view(dfs, institution, date_range)
+    users = f["users"]
     if users.empty: return pd.DataFrame(columns=["label","count","pct"])
-    s = users["status_academic"].value_counts(dropna=False).rename_axis("label").reset_index(name="count")
+    s = _value_counts(users["status_academic"], dropna=False)
     total = s["count"].sum()
     s["pct"] = s["count"]*100/total
     return s
 
-def skills_coverage(dfs, institution: Optional[str], date_range=None, skill_type="hard") -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
+@timed
+def skills_coverage(dfs, institution: Optional[str] = None, date_range=None, skill_type="hard") -> pd.DataFrame:
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        return sql.skills_coverage(sc, skill_type)
+    f = institution_view(dfs, institution, date_range)
     users = f["users"]; skills = f["skills"]
     if skills.empty or users.empty:
         return pd.DataFrame(columns=["skill_name","users","coverage_pct","avg_level"])
@@ -88,41 +363,154 @@ def skills_coverage(dfs, institution: Optional[str], date_range=None, skill_type
     if skills.empty:
         return pd.DataFrame(columns=["skill_name","users","coverage_pct","avg_level"])
     # usuarios únicos por skill
-    g = skills.groupby("skill_name", as_index=False).agg(users=("user_id","nunique"), avg_level=("level","mean"))
+    g = skills.groupby("skill_name", as_index=False, observed=True).agg(users=("user_id","nunique"), avg_level=("level","mean"))
     total_users = users["user_id"].nunique()
     g["coverage_pct"] = (g["users"] * 100.0 / max(1,total_users)).round(2)
     g["avg_level"] = g["avg_level"].round(2)
     g = g.sort_values(["coverage_pct","users"], ascending=[False,False])
     return g
 
-def skills_heatmap(dfs, institution: Optional[str], date_range=None, skill_type="hard") -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
+@dataclass
+class SkillLevelMatrix:
+    """
+    Conteos skill × nivel de un skill_type, precalculados por versión del dataset. Columna
+    `skill * len(levels) + nivel` (códigos enteros); filas por usuario (posición en users, 1 si
+    el usuario tiene esa skill con ese nivel) y por institución (suma de sus usuarios). Cualquier
+    institución/rango sale de una suma dispersa de filas.
+    """
+    skills: pd.Index                 # código -> skill_name (orden alfabético)
+    levels: np.ndarray               # código -> nivel
+    by_user: sp.csr_matrix           # (usuarios, skills·niveles) 0/1
+    by_institution: sp.csr_matrix    # (instituciones, skills·niveles)
+    institutions: pd.Index
+    total: np.ndarray                # todo el dataset
+
+    def counts(self, partition, institution: Optional[str], dates=None) -> np.ndarray:
+        """Usuarios distintos por celda para la selección, como matriz densa (skills, niveles)."""
+        if dates is not None:
+            vec = self.by_user[partition.user_positions(institution, dates)].sum(axis=0)
+        elif institution:
+            i = self.institutions.get_indexer([institution])[0]
+            vec = self.by_institution[i].toarray() if i >= 0 else np.zeros(self.by_user.shape[1])
+        else:
+            vec = self.total
+        return np.asarray(vec, dtype=np.int64).reshape(len(self.skills), len(self.levels))
+
+    def frame(self, counts: np.ndarray, top_k: Optional[int] = None) -> pd.DataFrame:
+        """Formato largo (skill_name, level, count) de las celdas no nulas; top_k skills por total."""
+        rows = np.flatnonzero(counts.sum(axis=1))
+        if top_k is not None:
+            rows = rows[np.lexsort((rows, -counts[rows].sum(axis=1)))][:top_k]
+            rows.sort()
+        s, l = np.nonzero(counts[rows])
+        return pd.DataFrame({"skill_name": self.skills[rows[s]], "level": self.levels[l], "count": counts[rows][s, l]})
+
+def build_skill_matrix(dfs: RawData, skill_type="hard") -> Optional[SkillLevelMatrix]:
+    """Construye la matriz de un skill_type; None si el dataset no tiene índice de particiones."""
+    index = dfs.partition
+    if index is None or not pd.Index(index.user_ids).is_unique:
+        return None
+    skills = dfs["skills"]
+    skills = skills[(skills["skill_type"] == skill_type) & skills["skill_name"].notna() & skills["level"].notna()]
+    # sólo filas de usuarios presentes en users (como el filtro de institution_view)
+    user_pos = pd.Index(index.user_ids).get_indexer(skills["user_id"].to_numpy())
+    skills, user_pos = skills[user_pos >= 0], user_pos[user_pos >= 0]
+    skill_code, skill_index = pd.factorize(skills["skill_name"].astype(str), sort=True)
+    level_code, levels = pd.factorize(skills["level"], sort=True)
+    levels = np.asarray(levels)
+    n_cols = max(1, len(skill_index) * len(levels))
+    col = skill_code * len(levels) + level_code
+
+    by_user = sp.csr_matrix((np.ones(user_pos.size, dtype=np.int32), (user_pos, col)), shape=(index.n_users, n_cols))
+    by_user.sum_duplicates()
+    by_user.data[:] = 1
+
+    institutions = pd.Index(list(index.by_institution))
+    inst_of_user = np.full(index.n_users, -1, dtype=np.int64)
+    for i, pos in enumerate(index.by_institution.values()):
+        inst_of_user[pos] = i
+    has_inst = inst_of_user >= 0
+    membership = sp.csr_matrix((np.ones(int(has_inst.sum()), dtype=np.int32), (inst_of_user[has_inst], np.flatnonzero(has_inst))),
+                               shape=(len(institutions), index.n_users))
+    by_institution = (membership @ by_user).tocsr()
+    total = np.asarray(by_user.sum(axis=0)).ravel()
+    return SkillLevelMatrix(pd.Index(skill_index), levels, by_user, by_institution, institutions, total)
+
+_SKILL_MATRICES = LRUCache(maxsize=4)
+
+@timed
+def skill_matrix(dfs, skill_type="hard") -> Optional[SkillLevelMatrix]:
+    """SkillLevelMatrix memoizada por (versión del dataset, skill_type)."""
+    if not isinstance(dfs, RawData):
+        return None
+    return _SKILL_MATRICES.get_or_create((dfs.version, skill_type), lambda: build_skill_matrix(dfs, skill_type))
+
+def _top_k_skills(heat: pd.DataFrame, top_k: Optional[int]) -> pd.DataFrame:
+    if top_k is None or heat.empty:
+        return heat
+    totals = heat.groupby("skill_name", observed=True)["count"].sum().reset_index()
+    keep = totals.sort_values(["count","skill_name"], ascending=[False,True], kind="stable")["skill_name"].head(top_k)
+    return heat[heat["skill_name"].isin(keep)].reset_index(drop=True)
+
+@timed
+def skills_heatmap(dfs, institution: Optional[str] = None, date_range=None, skill_type="hard",
+                   top_k: Optional[int] = None) -> pd.DataFrame:
+    """Usuarios distintos por (skill, nivel); con top_k sólo las K skills con más conteo."""
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        return _top_k_skills(sql.skills_heatmap(sc, skill_type), top_k)
+    source, institution, dates = _scope(dfs, institution, date_range)
+    m = skill_matrix(source, skill_type)
+    if m is not None:
+        heat = m.frame(m.counts(source.partition, institution, dates), top_k)
+        return heat if not heat.empty else pd.DataFrame(columns=["skill_name","level","count"])
+
+    f = institution_view(dfs, institution, date_range)
     skills = f["skills"]
     if skills.empty:
         return pd.DataFrame(columns=["skill_name","level","count"])
     df = skills[skills["skill_type"] == skill_type].copy()
     if df.empty:
         return pd.DataFrame(columns=["skill_name","level","count"])
-    heat = df.groupby(["skill_name","level"], as_index=False)["user_id"].nunique()
+    heat = df.groupby(["skill_name","level"], as_index=False, observed=True)["user_id"].nunique()
     heat = heat.rename(columns={"user_id":"count"})
-    return heat
+    return _top_k_skills(heat, top_k)
 
 def _coverage_from(skills: pd.DataFrame, users: pd.DataFrame, skill_type="hard") -> pd.DataFrame:
     df = skills[skills["skill_type"] == skill_type].copy()
     if df.empty or users.empty:
         return pd.DataFrame(columns=["skill_name","coverage_pct"])
-    g = df.groupby("skill_name", as_index=False).agg(users=("user_id","nunique"))
+    g = df.groupby("skill_name", as_index=False, observed=True).agg(users=("user_id","nunique"))
     total = users["user_id"].nunique()
     g["coverage_pct"] = (g["users"] * 100.0 / max(1,total)).round(2)
     return g[["skill_name","coverage_pct"]]
 
-def skills_gaps_vs_global(dfs, institution: Optional[str], date_range=None, skill_type="hard") -> pd.DataFrame:
-    """gap_pct = coverage_global - coverage_inst (positivo => oportunidad de refuerzo)"""
-    f_inst = filter_by_institution_and_date(dfs, institution, date_range)
-    f_all = filter_by_institution_and_date(dfs, institution=None, date_range=None)
+_GLOBAL_COVERAGE = LRUCache(maxsize=16)
 
-    cov_inst = _coverage_from(f_inst["skills"], f_inst["users"], skill_type=skill_type)
-    cov_global = _coverage_from(f_all["skills"], f_all["users"], skill_type=skill_type)
+@timed
+def global_skill_coverage(dfs, skill_type="hard") -> pd.DataFrame:
+    """Cobertura de skills de todo el dataset; depende sólo de los datos, se calcula una vez por versión y skill_type."""
+    src = dfs.source if isinstance(dfs, InstitutionView) else dfs
+
+    def build() -> pd.DataFrame:
+        f_all = institution_view(src)  # sin filas huérfanas (user_id que no está en users)
+        return _coverage_from(f_all["skills"], f_all["users"], skill_type=skill_type)
+
+    if not isinstance(src, RawData):
+        return build()
+    return _GLOBAL_COVERAGE.get_or_create((src.version, skill_type), build)
+
+@timed
+def skills_gaps_vs_global(dfs, institution: Optional[str] = None, date_range=None, skill_type="hard") -> pd.DataFrame:
+    """gap_pct = coverage_global - coverage_inst (positivo => oportunidad de refuerzo)"""
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        cov_inst = sql.coverage(sc, skill_type)
+        cov_global = global_skill_coverage(dfs, skill_type=skill_type)
+    else:
+        f_inst = institution_view(dfs, institution, date_range)
+        cov_inst = _coverage_from(f_inst["skills"], f_inst["users"], skill_type=skill_type)
+        cov_global = global_skill_coverage(f_inst, skill_type=skill_type)
     if cov_inst.empty or cov_global.empty:
         return pd.DataFrame(columns=["skill_name","gap_pct"])
 
@@ -132,8 +520,12 @@ def skills_gaps_vs_global(dfs, institution: Optional[str], date_range=None, skil
     m = m.sort_values("gap_pct", ascending=False)
     return m[["skill_name","gap_pct","coverage_pct_global","coverage_pct_inst"]]
 
-def salaries_experience_df(dfs, institution: Optional[str], date_range=None) -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
+@timed
+def salaries_experience_df(dfs, institution: Optional[str] = None, date_range=None) -> pd.DataFrame:
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        return sql.salaries_experience_df(sc)
+    f = institution_view(dfs, institution, date_range)
     users = f["users"]; onb = f["onboardings"]; work = f["workexperiences"]
 
     exp = _experience_years(work)
@@ -149,51 +541,197 @@ def salaries_experience_df(dfs, institution: Optional[str], date_range=None) ->
     out["salario_mid"] = out["salario_mid"].fillna(0.0)
     return out
 
-def salaries_box_by_group(dfs, institution: Optional[str], date_range=None, group_col="situacion_actual") -> pd.DataFrame:
+@timed
+def salaries_box_by_group(dfs, institution: Optional[str] = None, date_range=None, group_col="situacion_actual") -> pd.DataFrame:
     df = salaries_experience_df(dfs, institution, date_range)
     if df.empty:
         return pd.DataFrame(columns=[group_col,"salario_mid"])
     df[group_col] = df[group_col].fillna("(sin dato)")
     return df[[group_col,"salario_mid"]]
 
-def languages_distribution(dfs, institution: Optional[str], date_range=None) -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
+@timed
+def languages_distribution(dfs, institution: Optional[str] = None, date_range=None) -> pd.DataFrame:
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        return sql.languages_distribution(sc)
+    f = institution_view(dfs, institution, date_range)
     lang = f["languages"]
     if lang.empty:
         return pd.DataFrame(columns=["label","count","pct"])
-    s = lang["lang_code"].value_counts().rename_axis("label").reset_index(name="count")
+    s = _value_counts(lang["lang_code"])
     total = s["count"].sum()
     s["pct"] = s["count"] * 100.0 / max(1,total)
     return s
 
-def languages_level_summary(dfs, institution: Optional[str], date_range=None) -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range)
+@timed
+def languages_level_summary(dfs, institution: Optional[str] = None, date_range=None) -> pd.DataFrame:
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        return sql.languages_level_summary(sc, MCER_TO_NUM)
+    f = institution_view(dfs, institution, date_range)
     lang = f["languages"].copy()
     if lang.empty:
         return pd.DataFrame(columns=["lang_code","level_numeric_mean"])
-    lang["num"] = lang["level"].map(MCER_TO_NUM).fillna(0)
-    g = lang.groupby("lang_code", as_index=False)["num"].mean()
+    lang["num"] = lang["level"].map(MCER_TO_NUM).astype(float).fillna(0)
+    g = lang.groupby("lang_code", as_index=False, observed=True)["num"].mean()
     g = g.rename(columns={"num":"level_numeric_mean"}).sort_values("level_numeric_mean", ascending=False)
     return g
 
-def registrations_by_month(dfs, institution: Optional[str]) -> pd.DataFrame:
-    f = filter_by_institution_and_date(dfs, institution, date_range=None)
-    users = f["users"].copy()
+def _monthly_frame(months: pd.PeriodIndex, counts) -> pd.DataFrame:
+    """Serie mensual continua (meses sin altas en 0) con acumulado y promedio móvil de 3 meses."""
+    if len(months) == 0:
+        return pd.DataFrame(columns=["month","usuarios","acumulado","promedio_3m"])
+    s = pd.Series(np.asarray(counts, dtype=np.int64), index=months).groupby(level=0).sum()
+    s = s.reindex(pd.period_range(s.index.min(), s.index.max(), freq="M"), fill_value=0)
+    usuarios = s.to_numpy()
+    acumulado = np.cumsum(usuarios)
+    prev = np.concatenate([np.zeros(3, dtype=np.int64), acumulado])[:len(acumulado)]
+    promedio = (acumulado - prev) / np.minimum(np.arange(1, len(usuarios) + 1), 3)
+    return pd.DataFrame({"month": s.index.astype(str), "usuarios": usuarios, "acumulado": acumulado,
+                         "promedio_3m": promedio.round(2)})
+
+@dataclass
+class RegistrationSeries:
+    """
+    Altas por institución y día, precalculadas por versión del dataset (una fila por institución
+    y una última para usuarios sin institución). Una institución/rango es un corte del arreglo y
+    los meses salen de sumar los días del corte.
+    """
+    institutions: pd.Index
+    start: np.datetime64     # primer día (datetime64[D])
+    counts: np.ndarray       # (instituciones + 1, días) int64
+
+    @property
+    def end(self) -> np.datetime64:
+        return self.start + max(self.counts.shape[1] - 1, 0)
+
+    def monthly(self, institution: Optional[str], dates=None) -> pd.DataFrame:
+        if institution:
+            i = self.institutions.get_indexer([institution])[0]
+            row = self.counts[i] if i >= 0 else self.counts[:0].sum(axis=0)
+        else:
+            row = self.counts.sum(axis=0)
+        lo, hi = 0, row.size
+        if dates is not None:
+            lo = max(lo, int((np.datetime64(dates[0].date(), "D") - self.start).astype(np.int64)))
+            hi = min(hi, int((np.datetime64(dates[1].date(), "D") - self.start).astype(np.int64)) + 1)
+        days = row[lo:max(lo, hi)]
+        nz = np.flatnonzero(days)
+        if not nz.size:
+            return _monthly_frame(pd.PeriodIndex([], freq="M"), [])
+        days = days[nz[0]:nz[-1] + 1]
+        months = (self.start + lo + nz[0] + np.arange(days.size)).astype("datetime64[M]")
+        per_month = np.bincount((months - months[0]).astype(np.int64), weights=days).astype(np.int64)
+        return _monthly_frame(pd.period_range(pd.Period(months[0], freq="M"), periods=per_month.size, freq="M"), per_month)
+
+def _registration_counts(users: pd.DataFrame, institutions: pd.Index, start: np.datetime64, n_days: int) -> np.ndarray:
+    reg = users["registration_date"].to_numpy("datetime64[ns]")
+    ok = ~np.isnat(reg)
+    code = institutions.get_indexer(users["institution_name"].to_numpy(dtype=object))
+    code = np.where(code < 0, len(institutions), code)[ok]
+    day = (reg[ok].astype("datetime64[D]") - start).astype(np.int64)
+    flat = np.bincount(code * n_days + day, minlength=(len(institutions) + 1) * n_days)
+    return flat.reshape(len(institutions) + 1, n_days)
+
+def _day_span(users: pd.DataFrame) -> Optional[Tuple[np.datetime64, np.datetime64]]:
+    reg = users["registration_date"].dropna()
+    if reg.empty:
+        return None
+    return np.datetime64(reg.min().date(), "D"), np.datetime64(reg.max().date(), "D")
+
+@timed
+def build_registration_series(dfs) -> RegistrationSeries:
+    users = dfs["users"]
+    institutions = pd.Index(sorted(users["institution_name"].dropna().astype(str).unique()))
+    span = _day_span(users)
+    start, end = span or (np.datetime64(_now_date(), "D"),) * 2
+    n_days = int((end - start).astype(np.int64)) + 1 if span else 0
+    return RegistrationSeries(institutions, start, _registration_counts(users, institutions, start, n_days))
+
+_REG_SERIES = LRUCache(maxsize=4)
+
+def registration_series(dfs: RawData) -> RegistrationSeries:
+    """RegistrationSeries memoizada por versión del dataset."""
+    return _REG_SERIES.get_or_create(dfs.version, lambda: build_registration_series(dfs))
+
+def _patch_registrations(series: RegistrationSeries, new: RawData, affected: set) -> RegistrationSeries:
+    """Recuenta sólo las instituciones afectadas (y los usuarios sin institución); el resto se copia."""
+    users = new["users"]
+    names = users["institution_name"]
+    users = users[names.astype(str).isin(affected) | names.isna()]
+    institutions = series.institutions.union(pd.Index(sorted(users["institution_name"].dropna().astype(str).unique())))
+    span = _day_span(users)
+    has_old = series.counts.shape[1] > 0
+    starts = ([series.start] if has_old else []) + ([span[0]] if span else [])
+    ends = ([series.end] if has_old else []) + ([span[1]] if span else [])
+    if not starts:
+        return RegistrationSeries(institutions, series.start, np.zeros((len(institutions) + 1, 0), dtype=np.int64))
+    start, end = min(starts), max(ends)
+    n_days = int((end - start).astype(np.int64)) + 1
+    counts = _registration_counts(users, institutions, start, n_days)
+    shift = int((series.start - start).astype(np.int64))
+    keep = [i for i, name in enumerate(series.institutions) if name not in affected]
+    if keep and has_old:
+        rows = institutions.get_indexer(series.institutions[keep])
+        counts[rows, shift:shift + series.counts.shape[1]] = series.counts[keep]
+    return RegistrationSeries(institutions, start, counts)
+
+@timed
+def registrations_by_month(dfs, institution: Optional[str] = None, date_range=None) -> pd.DataFrame:
+    """Altas por mes (month, usuarios) con acumulado y promedio móvil de 3 meses (promedio_3m)."""
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        s = sql.registrations_by_month(sc)
+        return _monthly_frame(pd.PeriodIndex(s["month"], freq="M"), s["usuarios"])
+    source, institution, dates = _scope(dfs, institution, date_range)
+    if isinstance(source, RawData):
+        return registration_series(source).monthly(institution, dates)
+    f = institution_view(dfs, institution, date_range)
+    users = f["users"]
     if users.empty:
-        return pd.DataFrame(columns=["month","usuarios"])
-    users["month"] = pd.to_datetime(users["registration_date"]).dt.to_period("M").astype(str)
-    s = users.groupby("month", as_index=False)["user_id"].count().rename(columns={"user_id":"usuarios"})
-    return s
+        return _monthly_frame(pd.PeriodIndex([], freq="M"), [])
+    month = users["registration_date"].dt.to_period("M")
+    s = users["user_id"].groupby(month).count()
+    return _monthly_frame(s.index, s.to_numpy())
 
-def ready_to_hire_table(
-    dfs, institution: Optional[str], date_range=None,
-    min_exp_years: float = 1.0,
-    salary_mid_cap: float = 8000.0,
-    lang_required: Optional[List[str]] = None
-) -> pd.DataFrame:
-    """Segmentación simple: experiencia mínima, salario medio (mid) debajo de umbral, y cobertura de idiomas requerida."""
-    from .io_load import filter_by_institution_and_date
-    f = filter_by_institution_and_date(dfs, institution, date_range)
+READY_TO_HIRE_COLS = ["user_id","full_name","current_role","situacion_actual","exp_years","salario_mid","institution_name","modality_preference","status_academic"]
+
+@dataclass
+class SegmentIndex:
+    """
+    Tabla base de ready_to_hire precalculada para una institución/rango: máscara de bits de idiomas
+    por fila y exp_years/salario_mid ordenados, de modo que cada consulta sólo toca a los candidatos.
+    """
+    base: pd.DataFrame
+    lang_bits: Dict[str, int]
+    lang_mask: np.ndarray    # (filas, palabras) uint64
+    exp_order: np.ndarray    # argsort de exp_years
+    exp_sorted: np.ndarray
+    salario: np.ndarray
+    rank: np.ndarray         # posición de cada fila en el orden de salida (exp desc, salario asc)
+
+    def query(self, min_exp_years: float, salary_mid_cap: float, lang_required: Optional[List[str]] = None) -> pd.DataFrame:
+        cand = self.exp_order[np.searchsorted(self.exp_sorted, min_exp_years, side="left"):]
+        sal = self.salario[cand]
+        cand = cand[(sal > 0) & (sal <= salary_mid_cap)]
+        if lang_required:
+            req = _lang_mask_of(set(lang_required), self.lang_bits, self.lang_mask.shape[1])
+            if req is None:
+                cand = cand[:0]  # algún idioma requerido no aparece en el segmento
+            else:
+                cand = cand[((self.lang_mask[cand] & req) == req).all(axis=1)]
+        return self.base.take(cand[np.argsort(self.rank[cand], kind="stable")])
+
+def _lang_mask_of(codes, lang_bits: Dict[str, int], words: int) -> Optional[np.ndarray]:
+    mask = np.zeros(words, dtype=np.uint64)
+    for c in codes:
+        if c not in lang_bits:
+            return None
+        mask[lang_bits[c] // 64] |= np.uint64(1) << np.uint64(lang_bits[c] % 64)
+    return mask
+
+@timed
+def build_segment_index(f) -> SegmentIndex:
     users = f["users"]; onb = f["onboardings"]; work = f["workexperiences"]; lang = f["languages"]
 
     exp = _experience_years(work)
@@ -201,17 +739,83 @@ def ready_to_hire_table(
     base = users.merge(exp, on="user_id", how="left").merge(onb2[["user_id","salario_mid","situacion_actual"]], on="user_id", how="left")
     base["exp_years"] = base["exp_years"].fillna(0.0)
     base["salario_mid"] = base["salario_mid"].fillna(0.0)
+    base = base[[c for c in READY_TO_HIRE_COLS if c in base.columns]]
+
+    # Idiomas: un bit por lang_code, OR por usuario
+    lang = lang.dropna(subset=["lang_code"])
+    vocab = sorted(lang["lang_code"].unique().tolist())
+    lang_bits = {c: i for i, c in enumerate(vocab)}
+    words = max(1, (len(vocab) + 63) // 64)
+    uids = pd.Index(base["user_id"].unique())
+    per_user = np.zeros((len(uids), words), dtype=np.uint64)
+    u = uids.get_indexer(lang["user_id"])
+    bit = lang["lang_code"].map(lang_bits).astype(np.int64).to_numpy()
+    ok = u >= 0
+    np.bitwise_or.at(per_user, (u[ok], bit[ok] // 64), np.left_shift(np.uint64(1), (bit[ok] % 64).astype(np.uint64)))
+    lang_mask = per_user[uids.get_indexer(base["user_id"])] if len(base) else np.zeros((0, words), dtype=np.uint64)
+
+    exp_years = base["exp_years"].to_numpy(dtype=float)
+    salario = base["salario_mid"].to_numpy(dtype=float)
+    exp_order = np.argsort(exp_years, kind="stable")
+    rank = np.empty(len(base), dtype=np.int64)
+    rank[np.lexsort((salario, -exp_years))] = np.arange(len(base))
+    return SegmentIndex(base, lang_bits, lang_mask, exp_order, exp_years[exp_order], salario, rank)
+
+_SEGMENTS = LRUCache(maxsize=16)
+
+@timed
+def segment_index(dfs, institution: Optional[str] = None, date_range=None) -> SegmentIndex:
+    """SegmentIndex memoizado por (versión del dataset, institución, rango de registro)."""
+    view = institution_view(dfs, institution, date_range)
+    if not isinstance(view.source, RawData):
+        return build_segment_index(view)
+    return _SEGMENTS.get_or_create((view.source.version, view.institution, view.dates), lambda: build_segment_index(view))
+
+@timed
+def ready_to_hire_table(
+    dfs, institution: Optional[str] = None, date_range=None,
+    min_exp_years: float = 1.0,
+    salary_mid_cap: float = 8000.0,
+    lang_required: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Segmentación simple: experiencia mínima, salario medio (mid) debajo de umbral, y cobertura de idiomas requerida."""
+    sql, sc = _sql_scope(dfs, institution, date_range)
+    if sql:
+        return sql.ready_to_hire_table(sc, min_exp_years, salary_mid_cap, lang_required, columns=READY_TO_HIRE_COLS)
+    return segment_index(dfs, institution, date_range).query(min_exp_years, salary_mid_cap, lang_required)
+
+def _patch_cube(cube: KpiCube, new: RawData, affected: set, dates) -> KpiCube:
+    """Recalcula sólo las filas del cubo de las instituciones afectadas por un delta."""
+    users = new["users"]
+    users = users[users["institution_name"].astype(str).isin(affected)]
+    subset = {"users": users}
+    subset.update({name: new[name][new[name]["user_id"].isin(users["user_id"])] for name in CHILD_TABLES})
+    part = build_kpi_cube(subset, dates)
+    keep = ~cube.kpis.index.astype(str).isin(affected)
+    kpis = pd.concat([cube.kpis[keep], part.kpis])
+    kpis.index = kpis.index.astype(str)
+    dists = {}
+    for name, d in cube.dists.items():
+        d = pd.concat([d[~d["institution_name"].astype(str).isin(affected)], part.dists[name]], ignore_index=True)
+        d["institution_name"] = d["institution_name"].astype(str)
+        dists[name] = d.sort_values("institution_name", kind="stable", ignore_index=True)
+    return KpiCube(kpis=kpis.sort_index(), dists=dists)
+
+@register_delta_hook
+def _migrate_aggregates(old: RawData, new: RawData, affected: set):
+    """
+    Tras un delta: los cubos y la serie de altas se parchean sólo en las instituciones afectadas
+    y los SegmentIndex de instituciones no afectadas pasan tal cual a la versión nueva. La
+    cobertura global, las matrices skill × nivel y los sketches de cuantiles se recalculan
+    al pedirlos.
+    """
+    for (version, dates, day), cube in _CUBES.items():
+        if version == old.version:
+            _CUBES.put((new.version, dates, day), _patch_cube(cube, new, affected, dates))
+    for (version, institution, dates), seg in _SEGMENTS.items():
+        if version == old.version and institution and institution not in affected:
+            _SEGMENTS.put((new.version, institution, dates), seg)
+    series = _REG_SERIES.get(old.version)
+    if series is not None:
+        _REG_SERIES.put(new.version, _patch_registrations(series, new, affected))
 
-    # Idiomas
-    if lang_required:
-        per_user_langs = lang.groupby("user_id")["lang_code"].apply(lambda s: set(s.dropna().unique().tolist())).reset_index()
-        base = base.merge(per_user_langs, on="user_id", how="left")
-        base["lang_code"] = base["lang_code"].apply(lambda x: x if isinstance(x, set) else set())
-        req = set(lang_required)
-        base = base[base["lang_code"].apply(lambda s: req.issubset(s))].copy()
-        base = base.drop(columns=["lang_code"], errors="ignore")
-
-    out = base[(base["exp_years"] >= min_exp_years) & (base["salario_mid"] > 0) & (base["salario_mid"] <= salary_mid_cap)].copy()
-    cols = ["user_id","full_name","current_role","situacion_actual","exp_years","salario_mid","institution_name","modality_preference","status_academic"]
-    keep = [c for c in cols if c in out.columns]
-    return out[keep].sort_values(["exp_years","salario_mid"], ascending=[False,True])
@@ -0,0 +1,27 @@
+"""Datasets sintéticos (bench/synth.py) compartidos por los tests."""
+import pytest
+
+from bench.synth import generate
+from src import io_load
+
+DATE_RANGES = [None, ("2022-01-01", "2023-06-30"), ("2023-02-15", "2024-03-10")]
+
+def make_raw(n_users: int = 3000, seed: int = 1, orphans: bool = True, shuffle: bool = False) -> io_load.RawData:
+    """Tablas tipadas e indexadas como las de load_raw; con `orphans`, 1 de cada 9 usuarios se quita
+    de users y sus filas quedan huérfanas en las tablas hijas (no deben contar en ninguna ruta).
+    Con `shuffle`, users queda en orden aleatorio (no por user_id)."""
+    tables = generate(n_users, seed=seed)
+    if orphans:
+        users = tables["users"]
+        tables["users"] = users[users.index % 9 != 0].reset_index(drop=True)
+    if shuffle:
+        tables["users"] = tables["users"].sample(frac=1, random_state=seed).reset_index(drop=True)
+    dfs = {name: io_load._prepare_table(name, df) for name, df in tables.items()}
+    return io_load.index_tables(io_load._encode_user_ids(dfs))
+
+def institutions(raw):
+    return [i for i in io_load.list_institutions(raw["users"]) if i != "(sin datos)"]
+
+@pytest.fixture(scope="session")
+def raw():
+    return make_raw()
@@ -0,0 +1,41 @@
+"""Comentarios concurrentes con plazo: lo que no llega a tiempo sale con el fallback."""
+import time
+
+import pytest
+
+from src import comments as C
+
+MODULES = {
+    "KPIs": {"usuarios_total": 10, "activos_90d_pct": 5.0, "exp_mediana_anos": 2.0, "sal_mediana": 3000},
+    "Skills": {"top_hard": [{"skill_name": "SQL"}], "top_soft": [], "gap_top": []},
+    "SalariosExp": {"corr_approx": 0.4, "salario_p50": 3000, "exp_p50": 2.0},
+    "Idiomas": {"top_lang": [{"label": "en"}]},
+    "Series": {"peak_month": [{"month": "2024-01", "usuarios": 7}]},
+}
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    monkeypatch.setattr(C, "COMMENTS_BACKEND", "stub")
+    monkeypatch.setattr(C, "_CACHE", C.CommentCache(tmp_path / "comments.sqlite"))
+    return monkeypatch
+
+def test_off_backend_uses_fallback(monkeypatch):
+    monkeypatch.setattr(C, "COMMENTS_BACKEND", "off")
+    out = C.make_comment_summaries(MODULES)
+    assert out == {m: C._fallback_comment(m, s) for m, s in MODULES.items()}
+
+def test_stub_backend_answers_all_modules(stub):
+    stub.setattr(C, "STUB_DELAY", 0.0)
+    out = C.make_comment_summaries(MODULES, timeout=5)
+    assert out.keys() == MODULES.keys()
+    assert all(text.startswith("[stub]") for text in out.values())
+    assert len(C._CACHE) == len(MODULES)  # sólo se cachean respuestas del modelo
+
+def test_deadline_falls_back_and_runs_concurrently(stub):
+    stub.setattr(C, "STUB_DELAY", 2.0)
+    t = time.perf_counter()
+    out = C.make_comment_summaries(MODULES, timeout=0.3)
+    elapsed = time.perf_counter() - t
+    assert out == {m: C._fallback_comment(m, s) for m, s in MODULES.items()}
+    assert elapsed < 1.0  # un solo plazo para todos, no 5 × 0.3 s
+    assert len(C._CACHE) == 0
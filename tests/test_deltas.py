@@ -0,0 +1,76 @@
+"""apply_deltas con caches calientes debe dar lo mismo que reconstruir el dataset con las tablas ya actualizadas."""
+import pandas as pd
+import pytest
+
+from bench.parity import _same
+from bench.synth import generate
+from src import io_load, transforms as T
+from conftest import DATE_RANGES
+
+FUNCS = [T.dist_situacion_actual, T.dist_modalidad, T.dist_status_academic, T.skills_coverage,
+         T.skills_heatmap, T.skills_gaps_vs_global, T.salaries_experience_df, T.salaries_box_by_group,
+         T.languages_distribution, T.languages_level_summary, T.registrations_by_month, T.ready_to_hire_table]
+
+def _build(tables, version=None):
+    dfs = {name: io_load._prepare_table(name, df.copy()) for name, df in tables.items()}
+    return io_load.index_tables(io_load._encode_user_ids(dfs), version=version)
+
+def _deltas(tables, raw):
+    """Cambios de skills de 5 usuarios, un candidato de ready_to_hire que cambia de institución y
+    3 usuarios nuevos con onboarding."""
+    users = tables["users"]
+    first = users["institution_name"].iloc[0]
+    candidate = int(T.ready_to_hire_table(raw, first)["user_id"].iloc[0])
+    changed = [candidate] + users.loc[(users["institution_name"] == first) & (users["user_id"] != candidate),
+                                      "user_id"].head(4).tolist()
+    skills = tables["skills"][tables["skills"]["user_id"].isin(changed)].assign(level=5)
+    skills = pd.concat([skills, pd.DataFrame({"user_id": [changed[0]], "skill_name": ["Rust"],
+                                              "skill_type": ["hard"], "level": [3]})], ignore_index=True)
+    other = users.loc[users["institution_name"] != first, "institution_name"].iloc[0]
+    mover = users[users["user_id"] == candidate].assign(institution_name=other)
+    new_ids = users["user_id"].max() + pd.RangeIndex(1, 4)
+    new = users.head(3).assign(user_id=new_ids, institution_name="NUEVA", registration_date=pd.Timestamp("2023-05-05"))
+    onboardings = tables["onboardings"].head(3).assign(user_id=new_ids)
+    return [("skills", skills), ("users", pd.concat([mover, new], ignore_index=True)), ("onboardings", onboardings)]
+
+def _upsert(tables, deltas):
+    out = dict(tables)
+    for name, delta in deltas:
+        base = out[name]
+        out[name] = pd.concat([base[~base["user_id"].isin(delta["user_id"])], delta]).sort_values(
+            "user_id", kind="stable", ignore_index=True)
+    return out
+
+def _warm(raw):
+    """Cubos por rango y SegmentIndex/vistas de cada institución sin rango (_SEGMENTS guarda 16)."""
+    for dr in DATE_RANGES:
+        T.kpi_cube(raw, dr)
+    for inst in io_load.list_institutions(raw["users"]) + [None]:
+        T.segment_index(raw, inst)
+    T.registration_series(raw)
+    T.skill_matrix(raw, "hard")
+    T.global_skill_coverage(raw)
+
+def _outputs(raw, scopes):
+    return {(inst, dr): (T.compute_kpis_snapshot(raw, inst, dr), [fn(raw, inst, dr) for fn in FUNCS])
+            for dr in DATE_RANGES for inst in scopes}
+
+def test_deltas_match_rebuild():
+    tables = generate(1500, seed=3)
+    raw = _build(tables)
+    deltas = _deltas(tables, raw)
+    _warm(raw)
+    updated = io_load.apply_deltas(raw, deltas, version="con-deltas")
+    fresh = _build(_upsert(tables, deltas), version="reconstruido")
+    assert updated.version == "con-deltas"
+    assert io_load.list_institutions(updated["users"]) == io_load.list_institutions(fresh["users"])
+    assert "NUEVA" in io_load.list_institutions(updated["users"])
+
+    scopes = io_load.list_institutions(fresh["users"]) + [None]
+    got = _outputs(updated, scopes)  # primero la versión con deltas, mientras las caches migradas siguen ahí
+    expected = _outputs(fresh, scopes)
+    for (inst, dr), (snap, frames) in got.items():
+        assert snap == pytest.approx(expected[inst, dr][0], rel=1e-12), (inst, dr)
+        for fn, a, b in zip(FUNCS, frames, expected[inst, dr][1]):
+            ok, why = _same(a, b)
+            assert ok, f"{fn.__name__} inst={inst} rango={dr}: {why}"
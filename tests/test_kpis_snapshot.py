@@ -0,0 +1,38 @@
+"""compute_kpis_snapshot no debe depender de qué cache esté caliente (cubo o KpiQuantiles)."""
+import pytest
+
+from src import io_load, transforms as T
+from conftest import DATE_RANGES, institutions
+
+def _clear():
+    for cache in (io_load._VIEWS, T._CUBES, T._QUANTILES):
+        cache.clear()
+
+@pytest.mark.parametrize("date_range", DATE_RANGES)
+def test_snapshot_same_with_and_without_cube(raw, date_range):
+    _clear()
+    without_cube = {i: T.compute_kpis_snapshot(raw, i, date_range) for i in institutions(raw)}
+    T.kpi_cube(raw, date_range)
+    with_cube = {i: T.compute_kpis_snapshot(raw, i, date_range) for i in institutions(raw)}
+    assert with_cube.keys() == without_cube.keys()
+    for inst, snap in with_cube.items():
+        assert snap == pytest.approx(without_cube[inst], rel=1e-12), inst
+
+@pytest.mark.parametrize("date_range", DATE_RANGES)
+def test_snapshot_matches_filtered_tables(raw, date_range, monkeypatch):
+    """Mismos valores que recalcular sobre las tablas filtradas (sin índice ni caches), también el total."""
+    monkeypatch.setattr(T, "QUANTILE_MODE", "exact")  # el default; QUANTILE_MODE=sketch aproxima el total
+    _clear()
+    for inst in institutions(raw) + [None]:
+        f = io_load.filter_by_institution_and_date(dict(raw), inst, date_range)
+        assert T.compute_kpis_snapshot(raw, inst, date_range) == pytest.approx(
+            T.compute_kpis_snapshot(f, None), rel=1e-12), inst
+
+def test_percentiles_median_matches_snapshot(raw):
+    _clear()
+    T.kpi_cube(raw)
+    for inst in institutions(raw):
+        snap = T.compute_kpis_snapshot(raw, inst)
+        pct = T.kpi_percentiles(raw, inst, qs=(0.5,))
+        assert pct.loc["exp_years", "p50"] == pytest.approx(snap["exp_mediana_anos"], rel=1e-12)
+        assert pct.loc["salario_mid", "p50"] == pytest.approx(snap["sal_mediana"], rel=1e-12)
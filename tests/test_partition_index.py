@@ -0,0 +1,26 @@
+"""El filtro posicional (PartitionIndex) debe dar las mismas tablas que el filtro por máscaras e isin."""
+import pandas as pd
+import pytest
+
+from src import io_load
+from conftest import DATE_RANGES, institutions, make_raw
+
+def _mask_filter(raw, institution, date_range):
+    return io_load.filter_by_institution_and_date(dict(raw), institution, date_range)  # dict: sin índice
+
+@pytest.mark.parametrize("date_range", DATE_RANGES)
+def test_filter_indexed_matches_mask(raw, date_range):
+    assert raw.partition is not None
+    for inst in institutions(raw) + [None, "(no existe)"]:
+        indexed = io_load.filter_by_institution_and_date(raw, inst, date_range)
+        masked = _mask_filter(raw, inst, date_range)
+        for name in ["users"] + io_load.CHILD_TABLES:
+            pd.testing.assert_frame_equal(indexed[name].reset_index(drop=True), masked[name].reset_index(drop=True),
+                                          obj=f"{name} inst={inst} rango={date_range}")
+
+def test_no_orphans_flag(raw):
+    assert not any(raw.partition.no_orphans.values())
+    clean = make_raw(500, orphans=False)
+    assert all(clean.partition.no_orphans.values())
+    everything = io_load.filter_by_institution_and_date(clean, None)
+    assert all(everything[name] is clean[name] for name in ["users"] + io_load.CHILD_TABLES)  # sin copia
@@ -0,0 +1,31 @@
+"""RegistrationSeries (registrations_by_month) contra contar por mes las altas de las tablas filtradas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import io_load, transforms as T
+from conftest import DATE_RANGES, institutions
+
+def _groupby_months(raw, institution, date_range):
+    users = io_load.filter_by_institution_and_date(dict(raw), institution, date_range)["users"]
+    months = users["registration_date"].dt.strftime("%Y-%m")
+    return users["user_id"].groupby(months).count()
+
+@pytest.mark.parametrize("date_range", DATE_RANGES)
+def test_monthly_matches_groupby(raw, date_range):
+    T._REG_SERIES.clear()
+    assert T.registration_series(raw) is not None
+    for inst in institutions(raw) + [None, "(no existe)"]:
+        expected = _groupby_months(raw, inst, date_range)
+        got = T.registrations_by_month(raw, inst, date_range)
+        nonzero = got[got["usuarios"] > 0]
+        assert nonzero["month"].tolist() == expected.index.tolist(), (inst, date_range)
+        assert nonzero["usuarios"].tolist() == expected.tolist(), (inst, date_range)
+        if got.empty:
+            continue
+        # meses consecutivos, acumulado y promedio móvil consistentes con usuarios
+        months = pd.PeriodIndex(got["month"], freq="M")
+        assert (np.diff(months.asi8) == 1).all()
+        assert got["acumulado"].tolist() == np.cumsum(got["usuarios"]).tolist()
+        rolling = got["usuarios"].rolling(3, min_periods=1).mean().round(2)
+        np.testing.assert_allclose(got["promedio_3m"], rolling)
@@ -0,0 +1,30 @@
+"""SkillLevelMatrix (skills_heatmap) contra el groupby sobre las tablas filtradas."""
+import pandas as pd
+import pytest
+
+from src import io_load, transforms as T
+from conftest import DATE_RANGES, institutions
+
+def _groupby_heatmap(raw, institution, date_range, skill_type):
+    skills = io_load.filter_by_institution_and_date(dict(raw), institution, date_range)["skills"]
+    df = skills[(skills["skill_type"] == skill_type) & skills["skill_name"].notna() & skills["level"].notna()]
+    heat = df.groupby(["skill_name","level"], as_index=False, observed=True)["user_id"].nunique()
+    return heat.rename(columns={"user_id":"count"})
+
+def _sorted(df):
+    df = df[["skill_name","level","count"]].astype({"skill_name": str, "level": str, "count": "int64"})
+    return df.sort_values(["skill_name","level"]).reset_index(drop=True)
+
+@pytest.mark.parametrize("skill_type", ["hard", "soft"])
+@pytest.mark.parametrize("date_range", DATE_RANGES)
+def test_heatmap_matches_groupby(raw, date_range, skill_type):
+    T._SKILL_MATRICES.clear()
+    assert T.skill_matrix(raw, skill_type) is not None
+    for inst in institutions(raw) + [None]:
+        expected = _groupby_heatmap(raw, inst, date_range, skill_type)
+        got = T.skills_heatmap(raw, inst, date_range, skill_type)
+        pd.testing.assert_frame_equal(_sorted(got), _sorted(expected), obj=f"inst={inst} rango={date_range}")
+
+        top = T.skills_heatmap(raw, inst, date_range, skill_type, top_k=5)
+        pd.testing.assert_frame_equal(_sorted(top), _sorted(T._top_k_skills(expected, 5)),
+                                      obj=f"top_k inst={inst} rango={date_range}")
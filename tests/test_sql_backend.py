@@ -0,0 +1,29 @@
+"""Paridad pandas <-> DuckDB (TRANSFORMS_BACKEND) de los transforms con ruta SQL."""
+import pytest
+
+pytest.importorskip("duckdb")
+
+from bench.parity import CASES, ORDERED, _same
+from src import io_load, transforms as T
+from conftest import DATE_RANGES, institutions, make_raw
+
+@pytest.fixture(scope="module")
+def shuffled():
+    return make_raw(2000, seed=2, shuffle=True)  # users fuera del orden de user_id: el orden de filas importa
+
+def _run(monkeypatch, backend, call, raw, inst, date_range):
+    monkeypatch.setattr(T, "TRANSFORMS_BACKEND", backend)
+    for cache in (io_load._VIEWS, T._SEGMENTS):
+        cache.clear()
+    return call(T, raw, inst, date_range)
+
+@pytest.mark.parametrize("name", list(CASES))
+@pytest.mark.parametrize("dataset", ["raw", "shuffled"])
+def test_backends_agree(request, monkeypatch, name, dataset):
+    raw = request.getfixturevalue(dataset)
+    for inst in institutions(raw) + [None]:
+        for date_range in DATE_RANGES:
+            pandas_out = _run(monkeypatch, "pandas", CASES[name], raw, inst, date_range)
+            sql_out = _run(monkeypatch, "duckdb", CASES[name], raw, inst, date_range)
+            ok, why = _same(pandas_out, sql_out, ordered=name in ORDERED)
+            assert ok, f"{name} inst={inst} rango={date_range}: {why}"